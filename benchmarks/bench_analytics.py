@@ -0,0 +1,69 @@
+"""Duration queries over the NumPy service columns.
+
+Loads synthetic completed queues spread over a year and times the
+statistics queries. Run from the repository root:
+
+    python -m benchmarks.bench_analytics [rows]
+"""
+import sys
+import time
+
+import numpy as np
+
+from modules.items.analytics import ServiceColumns
+
+ROWS = 2_000_000
+CLINICS = 20
+DOCTORS = 200
+YEAR = 365 * 24 * 3_600_000_000
+
+
+def fill(columns: ServiceColumns, rows: int) -> None:
+    """Write the columns directly; ``add`` would time the Python loop, not the queries."""
+    rng = np.random.default_rng(1)
+    for i in range(CLINICS):
+        columns.clinics.encode(f"clinic-{i:03d}")
+    for i in range(DOCTORS):
+        columns.doctors.encode(f"doctor-{i:03d}")
+    while len(columns.live) < rows:
+        columns._grow()
+    registered = 1_704_067_200_000_000 + rng.integers(0, YEAR, rows)
+    called = registered + rng.gamma(2.0, 10 * 60e6, rows).astype(np.int64)
+    ended = called + rng.gamma(3.0, 5 * 60e6, rows).astype(np.int64)
+    columns.clinic[:rows] = rng.integers(0, CLINICS, rows)
+    columns.doctor[:rows] = rng.integers(0, DOCTORS, rows)
+    columns.registered[:rows] = registered
+    columns.called[:rows] = called
+    columns.started[:rows] = called
+    columns.ended[:rows] = ended
+    columns.live[:rows] = True
+    columns.size = rows
+    columns.row_of.update((f"q{i}", i) for i in range(rows))
+
+
+def timed(label: str, func) -> None:
+    start = time.perf_counter()
+    func()
+    print(f"{label:>36} {(time.perf_counter() - start) * 1000:>9.1f} ms")
+
+
+def main() -> None:
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else ROWS
+    columns = ServiceColumns()
+    fill(columns, rows)
+    size = sum(getattr(columns, name).nbytes for name in
+               ("clinic", "doctor", "registered", "called", "started", "ended", "live"))
+    print(f"{rows:,} completed queues, {size / 2**20:.0f} MiB of columns")
+
+    timed("overall service percentiles", lambda: columns.summary("service"))
+    timed("wait percentiles per clinic", lambda: columns.summary("wait", "clinic"))
+    timed("service percentiles per doctor", lambda: columns.summary("service", "doctor"))
+    timed("total percentiles per hour", lambda: columns.summary("total", "hour"))
+    timed("one clinic, one month", lambda: columns.summary(
+        "service", clinic_id="clinic-003",
+        since=1_704_067_200_000_000, until=1_704_067_200_000_000 + 31 * 24 * 3_600_000_000))
+    timed("service histogram, 5 min bins", lambda: columns.histogram("service", 5, 180))
+
+
+if __name__ == "__main__":
+    main()
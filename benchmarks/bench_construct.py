@@ -0,0 +1,86 @@
+"""Validated versus trusted construction and update of internal records.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_construct
+"""
+import time
+import uuid
+from datetime import datetime
+
+from modules.items.table import assign
+from modules.items.records import trusted
+from modules.schema.schemas import User, UserRole, Clinic, Doctor, Queue, QueueStatus, VisitHistory
+
+ROUNDS = 20_000
+
+
+def sample_values():
+    now = datetime.now().isoformat()
+    return {
+        User: {
+            "id": str(uuid.uuid4()), "name": "Patient", "email": "patient@example.com",
+            "phone": "08123456789", "role": UserRole.PATIENT,
+            "medical_record_number": "MR000001", "created_at": now
+        },
+        Clinic: {
+            "id": "clinic-001", "name": "Klinik Umum", "description": None,
+            "is_active": True, "created_at": now
+        },
+        Doctor: {
+            "id": "doctor-001", "name": "Dr. Budi", "specialization": "Umum",
+            "clinic_id": "clinic-001", "clinic_name": "Klinik Umum", "phone": "08123456789",
+            "is_available": True, "created_at": now
+        },
+        Queue: {
+            "id": str(uuid.uuid4()), "queue_number": "KLI001", "patient_id": str(uuid.uuid4()),
+            "patient_name": "Patient", "clinic_id": "clinic-001", "clinic_name": "Klinik Umum",
+            "doctor_id": None, "doctor_name": None, "status": QueueStatus.WAITING,
+            "registration_time": now
+        },
+        VisitHistory: {
+            "id": str(uuid.uuid4()), "queue_id": str(uuid.uuid4()), "patient_id": str(uuid.uuid4()),
+            "patient_name": "Patient", "clinic_id": "clinic-001", "clinic_name": "Klinik Umum",
+            "doctor_id": "doctor-001", "doctor_name": "Dr. Budi",
+            "visit_date": datetime.now().date().isoformat(), "service_status": "selesai"
+        },
+    }
+
+
+UPDATES = {
+    User: {"name": "Renamed"},
+    Clinic: {"is_active": False},
+    Doctor: {"is_available": False},
+    Queue: {"status": QueueStatus.IN_SERVICE, "called_time": datetime.now().isoformat()},
+    VisitHistory: {"diagnosis": "Flu", "treatment": "Istirahat"},
+}
+
+
+def per_call(func) -> float:
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        func()
+    return (time.perf_counter() - start) / ROUNDS * 1e6
+
+
+def setattr_update(row, changes) -> None:
+    for key, value in changes.items():
+        setattr(row, key, value)
+
+
+def main() -> None:
+    print(f"{'model':>14} {'validated (us)':>15} {'model_construct (us)':>21} {'trusted (us)':>13} "
+          f"{'setattr (us)':>13} {'assign (us)':>12}")
+    for model, values in sample_values().items():
+        row = model(**values)
+        build = trusted(model)
+        changes = UPDATES[model]
+        print(f"{model.__name__:>14} "
+              f"{per_call(lambda: model(**values)):>15.2f} "
+              f"{per_call(lambda: model.model_construct(**values)):>21.2f} "
+              f"{per_call(lambda: build(**values)):>13.2f} "
+              f"{per_call(lambda: setattr_update(row, changes)):>13.2f} "
+              f"{per_call(lambda: assign(row, changes)):>12.2f}")
+
+if __name__ == "__main__":
+    main()
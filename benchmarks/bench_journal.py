@@ -0,0 +1,65 @@
+"""Write overhead of the journal and restart time from snapshot + journal.
+
+Run from the repository root (default 1,000,000 queue records):
+
+    python -m benchmarks.bench_journal [records]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from modules.items import persistence, users, clinics, queues
+
+
+def reset_stores() -> None:
+    for table in [users.users_db, clinics.clinics_db, queues.queues_db]:
+        table.clear()
+    users.passwords_db.clear()
+    queues.queue_counters.clear()
+    queues.waiting_lines.clear()
+    queues.doctor_lines.clear()
+    queues.queue_stats.clear()
+
+
+def create_queues(count: int) -> float:
+    patient = users.create_user("Patient", "patient@example.com", "password123", "08123456789")
+    clinic = clinics.create_clinic("Klinik Bench")
+    start = time.perf_counter()
+    for _ in range(count):
+        queues.create_queue(patient.id, patient.name, clinic.id)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    directory = tempfile.mkdtemp(prefix="hospital-journal-")
+    try:
+        plain = create_queues(count)
+        reset_stores()
+
+        persistence.open_journal(directory)
+        journaled = create_queues(count)
+        persistence.close_journal()
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        reset_stores()
+
+        start = time.perf_counter()
+        persistence.open_journal(directory)
+        restart = time.perf_counter() - start
+        restored = len(queues.queues_db)
+        persistence.close_journal()
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"records:            {count:,}")
+    print(f"in-memory insert:   {plain / count * 1e6:8.2f} us/record")
+    print(f"journaled insert:   {journaled / count * 1e6:8.2f} us/record "
+          f"(+{(journaled - plain) / count * 1e6:.2f} us)")
+    print(f"on-disk size:       {size / 2**20:8.1f} MiB")
+    print(f"restart:            {restart:8.2f} s for {restored:,} queues")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Login latency versus registered user count.
+
+Users are populated with one precomputed password hash so the slow KDF only
+runs where it is measured. The login column covers lookup and session
+handling; the KDF cost per verification is constant and reported once.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_login
+"""
+import random
+import time
+
+from modules.items import users as user_crud
+from modules.items.passwords import hash_password
+
+SIZES = [1_000, 10_000, 100_000]
+LOOKUPS = 2_000
+KDF_ROUNDS = 20
+PASSWORD_HASH = hash_password("password123")
+
+
+def populate(count: int) -> None:
+    for i in range(len(user_crud.users_db), count):
+        user_crud.create_user(
+            name=f"Patient {i}",
+            email=f"patient{i}@example.com",
+            password=None,
+            phone="08123456789",
+            password_hash=PASSWORD_HASH
+        )
+
+
+def linear_scan(email: str):
+    return next((u for u in user_crud.users_db.values() if u.email == email), None)
+
+
+def time_per_call(func, emails) -> float:
+    start = time.perf_counter()
+    for email in emails:
+        func(email)
+    return (time.perf_counter() - start) / len(emails) * 1e6
+
+
+def login(email: str) -> None:
+    user = user_crud.read_user_by_email(email)
+    token, _ = user_crud.create_session(user.id)
+    user_crud.delete_session(token)
+
+
+def verify(email: str) -> None:
+    user = user_crud.read_user_by_email(email)
+    user_crud.verify_password(user.id, "password123")
+
+
+def main() -> None:
+    populate(1)
+    kdf = time_per_call(verify, ["patient0@example.com"] * KDF_ROUNDS)
+    print(f"password verification (KDF): {kdf / 1000:.1f} ms")
+    print(f"{'users':>10} {'login (us)':>12} {'indexed lookup (us)':>20} {'linear scan (us)':>18}")
+    for size in SIZES:
+        populate(size)
+        emails = [f"patient{random.randrange(size)}@example.com" for _ in range(LOOKUPS)]
+        scan_emails = emails[:max(LOOKUPS * 1_000 // size, 10)]
+        print(f"{size:>10} "
+              f"{time_per_call(login, emails):>12.2f} "
+              f"{time_per_call(user_crud.read_user_by_email, emails):>20.2f} "
+              f"{time_per_call(linear_scan, scan_emails):>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
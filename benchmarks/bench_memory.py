@@ -0,0 +1,109 @@
+"""Memory held by queue and visit rows: pydantic models versus compact records.
+
+Builds the rows a restart would load (every string arriving as its own
+copy, as it does from the journal or the database) and reports how much
+resident memory they add. Each variant runs in its own process so freed
+arenas of one do not hide the cost of the next; needs Linux ``/proc``.
+Run from the repository root:
+
+    python -m benchmarks.bench_memory [records]
+"""
+import gc
+import os
+import subprocess
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+from modules.items.queues import QueueRecord
+from modules.items.records import trusted
+from modules.items.visits import VisitRecord
+from modules.schema.schemas import Queue, QueueStatus, VisitHistory
+
+RECORDS = 1_000_000
+CLINICS = ["Klinik Umum", "Klinik Gigi", "Klinik Anak", "Klinik Mata", "Klinik Kulit"]
+DOCTORS = [f"Dr. Dokter {i:02d}" for i in range(40)]
+START = datetime(2024, 1, 1, 7, 0)
+
+
+def copy(value: str) -> str:
+    return "".join(list(value))
+
+
+def queue_values(i: int) -> dict:
+    registered = START + timedelta(seconds=37 * i)
+    clinic = i % len(CLINICS)
+    doctor = i % len(DOCTORS)
+    return {
+        "id": str(uuid.UUID(int=i)), "queue_number": f"KLI{i % 1000:03d}",
+        "patient_id": str(uuid.UUID(int=i % 50_000 + 1 << 64)), "patient_name": f"Pasien {i % 50_000}",
+        "clinic_id": copy(f"clinic-{clinic:03d}"), "clinic_name": copy(CLINICS[clinic]),
+        "doctor_id": copy(f"doctor-{doctor:03d}"), "doctor_name": copy(DOCTORS[doctor]),
+        "status": QueueStatus.COMPLETED,
+        "registration_time": registered.isoformat(),
+        "called_time": (registered + timedelta(minutes=20)).isoformat(),
+        "service_start_time": (registered + timedelta(minutes=20)).isoformat(),
+        "service_end_time": (registered + timedelta(minutes=35)).isoformat(),
+    }
+
+
+def visit_values(i: int) -> dict:
+    clinic = i % len(CLINICS)
+    doctor = i % len(DOCTORS)
+    return {
+        "id": str(uuid.UUID(int=i)), "queue_id": str(uuid.UUID(int=i + (1 << 96))),
+        "patient_id": str(uuid.UUID(int=i % 50_000 + 1 << 64)), "patient_name": f"Pasien {i % 50_000}",
+        "clinic_id": copy(f"clinic-{clinic:03d}"), "clinic_name": copy(CLINICS[clinic]),
+        "doctor_id": copy(f"doctor-{doctor:03d}"), "doctor_name": copy(DOCTORS[doctor]),
+        "visit_date": (date(2024, 1, 1) + timedelta(days=i % 365)).isoformat(),
+        "service_status": copy("selesai"),
+    }
+
+
+def resident_bytes() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+def variants():
+    build_queue = trusted(Queue)
+    build_visit = trusted(VisitHistory)
+    return {
+        "Queue (pydantic)": (queue_values, lambda v: build_queue(**v)),
+        "QueueRecord (slots)": (queue_values, lambda v: QueueRecord.from_schema(build_queue(**v))),
+        "VisitHistory (pydantic)": (visit_values, lambda v: build_visit(**v)),
+        "VisitRecord (slots)": (visit_values, lambda v: VisitRecord.from_schema(build_visit(**v))),
+    }
+
+
+def measure(label: str, count: int) -> None:
+    make_values, build = variants()[label]
+    gc.collect()
+    gc.disable()
+    before = resident_bytes()
+    start = time.perf_counter()
+    rows = {}
+    for i in range(count):
+        row = build(make_values(i))
+        rows[row.id] = row
+    elapsed = time.perf_counter() - start
+    retained = resident_bytes() - before
+    print(f"{label:>24} {retained / 2**20:>10.1f} MiB {retained / count:>9.0f} B/row {elapsed:>8.1f} s",
+          flush=True)
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    if len(sys.argv) > 2:
+        measure(sys.argv[2], count)
+        return
+
+    print(f"{count:,} rows each, resident memory added including the id -> row dict")
+    print(f"{'rows':>24} {'retained':>14} {'per row':>15} {'build':>10}", flush=True)
+    for label in variants():
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_memory", str(count), label], check=True)
+
+
+if __name__ == "__main__":
+    main()
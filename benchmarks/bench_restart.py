@@ -0,0 +1,135 @@
+"""Restart time: replaying a snapshot and a journal of queue and visit rows.
+
+Writes ``queues`` queues and ``visits`` visits (default a quarter as many)
+once as a snapshot and once as plain journal segments, then restores each
+into empty stores and reports the phases of the restart: parsing the JSON
+lines, decoding rows with the storage codec, and loading the tables plus
+the on-load rebuilds (waiting lines, statistics, service columns, sketches).
+Run from the repository root (default 1,000,000 queues):
+
+    python -m benchmarks.bench_restart [queues] [visits]
+"""
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+
+from modules.items import persistence, queues, visits, analytics, sketches
+from modules.items.queues import QueueRecord
+from modules.items.visits import VisitRecord
+from modules.items.records import row_codec
+from modules.schema.schemas import QueueStatus
+
+RECORDS = 1_000_000
+CLINICS = ["Klinik Umum", "Klinik Gigi", "Klinik Anak", "Klinik Mata", "Klinik Kulit"]
+DOCTORS = [f"Dr. Dokter {i:02d}" for i in range(40)]
+START = 1_704_092_400_000_000  # 2024-01-01 07:00 in epoch microseconds
+MINUTE = 60_000_000
+
+
+def make_queue(i: int) -> QueueRecord:
+    registered = START + 37_000_000 * i
+    waiting = i % 10 == 0
+    return QueueRecord(
+        id=str(uuid.UUID(int=i)), queue_number=f"KLI{i % 1000:03d}",
+        patient_id=str(uuid.UUID(int=i % 50_000 + 1 << 64)), patient_name=f"Pasien {i % 50_000}",
+        clinic_id=f"clinic-{i % len(CLINICS):03d}", clinic_name=CLINICS[i % len(CLINICS)],
+        doctor_id=f"doctor-{i % len(DOCTORS):03d}", doctor_name=DOCTORS[i % len(DOCTORS)],
+        status=QueueStatus.WAITING if waiting else QueueStatus.COMPLETED,
+        registration_at=registered,
+        called_at=None if waiting else registered + 20 * MINUTE,
+        service_start_at=None if waiting else registered + 20 * MINUTE,
+        service_end_at=None if waiting else registered + 35 * MINUTE,
+    )
+
+
+def make_visit(i: int) -> VisitRecord:
+    return VisitRecord(
+        id=str(uuid.UUID(int=i + (1 << 96))), queue_id=str(uuid.UUID(int=i)),
+        patient_id=str(uuid.UUID(int=i % 50_000 + 1 << 64)), patient_name=f"Pasien {i % 50_000}",
+        clinic_id=f"clinic-{i % len(CLINICS):03d}", clinic_name=CLINICS[i % len(CLINICS)],
+        doctor_id=f"doctor-{i % len(DOCTORS):03d}", doctor_name=DOCTORS[i % len(DOCTORS)],
+        visit_date=f"2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}", diagnosis="Flu", service_status="selesai",
+    )
+
+
+def reset_stores() -> None:
+    queues.queues_db.clear()
+    visits.visits_db.clear()
+    queues.waiting_lines.clear()
+    queues.doctor_lines.clear()
+    queues.rebuild_queue_stats()
+    analytics.service_columns.clear()
+    sketches.wait_times.clear()
+    gc.collect()
+
+
+def write_snapshot(directory: str, count: int, visit_count: int) -> None:
+    queues.queues_db.load(make_queue(i) for i in range(count))
+    visits.visits_db.load(make_visit(i) for i in range(visit_count))
+    journal = persistence.open_journal(directory)
+    journal.snapshot()
+    persistence.close_journal()
+
+
+def write_journal(directory: str, count: int, visit_count: int) -> None:
+    persistence.open_journal(directory, snapshot_every=10 * count)
+    for i in range(count):
+        queues.queues_db.insert(make_queue(i))
+    for i in range(visit_count):
+        visits.visits_db.insert(make_visit(i))
+    persistence.close_journal()
+
+
+def restore(directory: str) -> dict:
+    """Time each phase of ``persistence.open_journal`` on ``directory``."""
+    state = {}
+    start = time.perf_counter()
+    snapshot = os.path.join(directory, persistence.SNAPSHOT_FILE)
+    if os.path.exists(snapshot):
+        persistence._replay(snapshot, state, skip_header=True)
+    for segment in persistence._segments(directory):
+        persistence._replay(persistence._segment_path(directory, segment), state)
+    parsed = time.perf_counter()
+
+    for table, model in [("queues", QueueRecord), ("visits", VisitRecord)]:
+        decode = row_codec(model).decode
+        for values in state.get(table, {}).values():
+            decode(values)
+    decoded = time.perf_counter()
+    del state
+    gc.collect()
+
+    start_open = time.perf_counter()
+    persistence.open_journal(directory)
+    opened = time.perf_counter()
+    persistence.close_journal()
+    restored = len(queues.queues_db) + len(visits.visits_db)
+    reset_stores()
+    return {"parse": parsed - start, "decode": decoded - parsed,
+            "restart": opened - start_open, "rows": restored}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else RECORDS
+    visit_count = int(sys.argv[2]) if len(sys.argv) > 2 else count // 4
+    print(f"{count:,} queues + {visit_count:,} visits")
+    print(f"{'source':>10} {'on disk':>10} {'parse':>8} {'decode':>8} {'restart':>9} {'per row':>9}")
+    for label, write in [("snapshot", write_snapshot), ("journal", write_journal)]:
+        directory = tempfile.mkdtemp(prefix="hospital-restart-")
+        try:
+            write(directory, count, visit_count)
+            reset_stores()
+            size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+            result = restore(directory)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"{label:>10} {size / 2**20:>6.0f} MiB {result['parse']:>6.1f} s {result['decode']:>6.1f} s "
+              f"{result['restart']:>7.1f} s {result['restart'] / result['rows'] * 1e6:>6.1f} us", flush=True)
+
+
+if __name__ == "__main__":
+    main()
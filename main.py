@@ -1,21 +1,51 @@
+import os
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Response
-from modules.routes import auth, clinics, doctors, queues, visits, statistics
+from modules.routes import auth, clinics, doctors, queues, visits, statistics, live
+from modules.items import users as user_crud
 from modules.items.users import users_db
 from modules.items.clinics import clinics_db
 from modules.items.doctors import doctors_db
 from modules.items.queues import queues_db
+from modules.items import persistence, repository
+from modules.items.passwords import hashing_pool
+
+
+SESSION_SWEEP_SECONDS = float(os.getenv("HOSPITAL_SESSION_SWEEP_SECONDS", "60"))
+
+
+async def sweep_sessions(interval: float):
+    while True:
+        await asyncio.sleep(interval)
+        while user_crud.sweep_expired_sessions():
+            await asyncio.sleep(0)
+        user_crud.prune_revoked_tokens()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    repository.open_storage()
+    sweeper = asyncio.create_task(sweep_sessions(SESSION_SWEEP_SECONDS))
+    yield
+    sweeper.cancel()
+    hashing_pool.shutdown()
+    repository.close_storage()
+
 
 app = FastAPI(
     title="Hospital Queue Management System",
     description="API for hospital queue management system",
     version="1.2.3",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 app.include_router(auth.router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(clinics.router, prefix="/api/clinics", tags=["Clinics"])
 app.include_router(doctors.router, prefix="/api/doctors", tags=["Doctors"])
+app.include_router(live.router, prefix="/api/queues/live", tags=["Live Updates"])
 app.include_router(queues.router, prefix="/api/queues", tags=["Queue Management"])
 app.include_router(visits.router, prefix="/api/visit-history", tags=["Visit History"])
 app.include_router(statistics.router, prefix="/api/statistics", tags=["Statistics"])
@@ -30,16 +60,22 @@ async def root():
         "documentation": "/docs"
     }
 
+def storage_type() -> str:
+    if repository.using_sql():
+        return "SQL"
+    return "In-Memory + Journal" if persistence.journal else "In-Memory"
+
+
 @app.get("/health", tags=["System"])
 async def health_check():
     from modules.schema.schemas import QueueStatus
     
-    active_queues = len([q for q in queues_db.values() 
-                        if q.status in [QueueStatus.WAITING, QueueStatus.IN_SERVICE]])
+    active_queues = (queues_db.count(status=QueueStatus.WAITING)
+                     + queues_db.count(status=QueueStatus.IN_SERVICE))
     
     return {
         "status": "healthy",
-        "storage_type": "In-Memory",
+        "storage_type": storage_type(),
         "statistics": {
             "total_users": len(users_db),
             "total_clinics": len(clinics_db),
@@ -1,9 +1,93 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Boolean, Column, Index, Integer, String, Text
 from database import Base
 
-class Item(Base):
-    __tablename__ = "items"
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255))
-    description = Column(String(255))
\ No newline at end of file
+class UserRow(Base):
+    __tablename__ = "users"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(36), unique=True, nullable=False)
+    name = Column(String(255), nullable=False)
+    email = Column(String(255), nullable=False)
+    email_key = Column(String(255), unique=True, nullable=False)
+    phone = Column(String(50), nullable=False)
+    role = Column(String(20), nullable=False, index=True)
+    medical_record_number = Column(String(20))
+    created_at = Column(String(32), nullable=False)
+
+
+class ClinicRow(Base):
+    __tablename__ = "clinics"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(36), unique=True, nullable=False)
+    name = Column(String(255), nullable=False)
+    description = Column(Text)
+    is_active = Column(Boolean, nullable=False, index=True)
+    created_at = Column(String(32), nullable=False)
+
+
+class DoctorRow(Base):
+    __tablename__ = "doctors"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(36), unique=True, nullable=False)
+    name = Column(String(255), nullable=False)
+    specialization = Column(String(255), nullable=False)
+    clinic_id = Column(String(36), nullable=False, index=True)
+    clinic_name = Column(String(255))
+    phone = Column(String(50), nullable=False)
+    is_available = Column(Boolean, nullable=False, index=True)
+    created_at = Column(String(32), nullable=False)
+
+    __table_args__ = (Index("ix_doctors_clinic_availability", "clinic_id", "is_available"),)
+
+
+class QueueRow(Base):
+    __tablename__ = "queues"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(36), unique=True, nullable=False)
+    queue_number = Column(String(20), nullable=False)
+    patient_id = Column(String(36), nullable=False, index=True)
+    patient_name = Column(String(255), nullable=False)
+    clinic_id = Column(String(36), nullable=False, index=True)
+    clinic_name = Column(String(255), nullable=False)
+    doctor_id = Column(String(36))
+    doctor_name = Column(String(255))
+    status = Column(String(20), nullable=False, index=True)
+    registration_at = Column(BigInteger, nullable=False)
+    called_at = Column(BigInteger)
+    service_start_at = Column(BigInteger)
+    service_end_at = Column(BigInteger)
+    notes = Column(Text)
+
+    __table_args__ = (Index("ix_queues_clinic_status", "clinic_id", "status"),)
+
+
+class VisitRow(Base):
+    __tablename__ = "visits"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    id = Column(String(36), unique=True, nullable=False)
+    queue_id = Column(String(36), nullable=False, index=True)
+    patient_id = Column(String(36), nullable=False, index=True)
+    patient_name = Column(String(255), nullable=False)
+    clinic_id = Column(String(36), nullable=False, index=True)
+    clinic_name = Column(String(255), nullable=False)
+    doctor_id = Column(String(36), nullable=False)
+    doctor_name = Column(String(255), nullable=False)
+    visit_date = Column(String(10), nullable=False, index=True)
+    diagnosis = Column(Text)
+    treatment = Column(Text)
+    notes = Column(Text)
+    service_status = Column(String(20), nullable=False)
+
+
+class KeyValueRow(Base):
+    """Small keyed values (password hashes, counters, sequences), grouped by store."""
+    __tablename__ = "key_values"
+
+    store = Column(String(50), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    value = Column(Text, nullable=False)
@@ -0,0 +1,192 @@
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.schema.schemas import QueueStatus
+from modules.items.queues import QueueRecord, queues_db
+from modules.items import persistence
+
+MISSING = np.iinfo(np.int64).min
+HOUR = 3_600_000_000
+
+METRICS: Dict[str, Tuple[str, str]] = {
+    "wait": ("registered", "called"),
+    "service": ("started", "ended"),
+    "total": ("registered", "ended"),
+}
+
+
+class Codes:
+    """Dense integer codes for the ids of one column."""
+
+    def __init__(self):
+        self.code_of: Dict[Optional[str], int] = {}
+        self.keys: List[Optional[str]] = []
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def encode(self, key: Optional[str]) -> int:
+        code = self.code_of.get(key)
+        if code is None:
+            code = self.code_of[key] = len(self.keys)
+            self.keys.append(key)
+        return code
+
+    def clear(self) -> None:
+        self.code_of.clear()
+        self.keys.clear()
+
+
+class ServiceColumns:
+    """Completed queues as parallel NumPy columns.
+
+    Each completed queue is one row: clinic and doctor codes plus the
+    registration, called, service start and service end times in epoch
+    microseconds (``MISSING`` when a step was skipped). Columns grow by
+    doubling; a queue that is deleted or leaves the completed status is only
+    masked out. Queries select rows with boolean masks, group by sorting on
+    the codes and aggregate with ``percentile`` and ``histogram`` instead of
+    Python loops.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.size = 0
+        self.clinics = Codes()
+        self.doctors = Codes()
+        self.row_of: Dict[str, int] = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int) -> None:
+        self.clinic = np.zeros(capacity, np.int32)
+        self.doctor = np.zeros(capacity, np.int32)
+        self.registered = np.full(capacity, MISSING, np.int64)
+        self.called = np.full(capacity, MISSING, np.int64)
+        self.started = np.full(capacity, MISSING, np.int64)
+        self.ended = np.full(capacity, MISSING, np.int64)
+        self.live = np.zeros(capacity, bool)
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    def _grow(self) -> None:
+        columns = ("clinic", "doctor", "registered", "called", "started", "ended", "live")
+        old = {name: getattr(self, name) for name in columns}
+        self._allocate(2 * len(self.live))
+        for name, values in old.items():
+            getattr(self, name)[:self.size] = values[:self.size]
+
+    def clear(self) -> None:
+        self.size = 0
+        self.clinics.clear()
+        self.doctors.clear()
+        self.row_of.clear()
+        self._allocate(1024)
+
+    def add(self, queue: QueueRecord) -> None:
+        row = self.row_of.get(queue.id)
+        if row is None:
+            if self.size == len(self.live):
+                self._grow()
+            row = self.row_of[queue.id] = self.size
+            self.size += 1
+        self.clinic[row] = self.clinics.encode(queue.clinic_id)
+        self.doctor[row] = self.doctors.encode(queue.doctor_id)
+        for column, value in (("registered", queue.registration_at), ("called", queue.called_at),
+                              ("started", queue.service_start_at), ("ended", queue.service_end_at)):
+            getattr(self, column)[row] = MISSING if value is None else value
+        self.live[row] = True
+
+    def discard(self, queue_id: str) -> None:
+        row = self.row_of.pop(queue_id, None)
+        if row is not None:
+            self.live[row] = False
+
+    def load(self, queues: Iterable[QueueRecord]) -> None:
+        self.clear()
+        for queue in queues:
+            self.add(queue)
+
+    def queue_changed(self, queue_id: str, queue: Optional[QueueRecord]) -> None:
+        if queue is not None and queue.status == QueueStatus.COMPLETED:
+            self.add(queue)
+        else:
+            self.discard(queue_id)
+
+    def _select(self, clinic_id: Optional[str], doctor_id: Optional[str],
+                since: Optional[int], until: Optional[int]) -> np.ndarray:
+        n = self.size
+        mask = self.live[:n].copy()
+        if clinic_id is not None:
+            mask &= self.clinic[:n] == self.clinics.code_of.get(clinic_id, -1)
+        if doctor_id is not None:
+            mask &= self.doctor[:n] == self.doctors.code_of.get(doctor_id, -1)
+        if since is not None:
+            mask &= self.registered[:n] >= since
+        if until is not None:
+            mask &= self.registered[:n] < until
+        return mask
+
+    def durations(self, metric: str, clinic_id: Optional[str] = None, doctor_id: Optional[str] = None,
+                  since: Optional[int] = None, until: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Row numbers and durations in minutes of the selected queues that
+        went through both steps of ``metric``."""
+        first, last = (getattr(self, column)[:self.size] for column in METRICS[metric])
+        mask = self._select(clinic_id, doctor_id, since, until) & (first != MISSING) & (last != MISSING)
+        rows = np.flatnonzero(mask)
+        return rows, (last[rows] - first[rows]) / 60e6
+
+    def _group_codes(self, group_by: str, rows: np.ndarray) -> Tuple[np.ndarray, Sequence]:
+        if group_by == "clinic":
+            return self.clinic[rows], self.clinics.keys
+        if group_by == "doctor":
+            return self.doctor[rows], self.doctors.keys
+        return (self.registered[rows] // HOUR % 24).astype(np.int32), range(24)
+
+    def summary(self, metric: str, group_by: Optional[str] = None,
+                percentiles: Sequence[float] = (50, 90, 99), **filters) -> List[Dict]:
+        """Count, mean and percentiles of ``metric`` in minutes, overall or
+        per clinic, doctor or hour of registration."""
+        rows, values = self.durations(metric, **filters)
+        if group_by is None:
+            return [_describe(values, percentiles)] if len(values) else []
+
+        codes, keys = self._group_codes(group_by, rows)
+        if len(keys) <= np.iinfo(np.int16).max:
+            codes = codes.astype(np.int16)  # stable sort of 16-bit keys is a radix sort
+        order = np.argsort(codes, kind="stable")
+        codes, values = codes[order], values[order]
+        starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], int)
+        return [{"key": keys[codes[start]], **_describe(group, percentiles)}
+                for start, group in zip(starts, np.split(values, starts[1:]))]
+
+    def histogram(self, metric: str, bin_minutes: float, max_minutes: float, **filters) -> Dict:
+        _, values = self.durations(metric, **filters)
+        edges = np.arange(0, max_minutes + bin_minutes, bin_minutes)
+        counts, edges = np.histogram(values, bins=edges)
+        return {
+            "bins": [{"from_minutes": float(lo), "to_minutes": float(hi), "count": int(count)}
+                     for lo, hi, count in zip(edges[:-1], edges[1:], counts)],
+            "overflow": int(np.count_nonzero(values > edges[-1])),
+            "total": int(len(values))
+        }
+
+
+def _describe(values: np.ndarray, percentiles: Sequence[float]) -> Dict:
+    points = np.percentile(values, percentiles) if len(percentiles) else []
+    return {
+        "count": int(len(values)),
+        "mean_minutes": round(float(values.mean()), 2),
+        **{f"p{p:g}_minutes": round(float(v), 2) for p, v in zip(percentiles, points)}
+    }
+
+
+service_columns = ServiceColumns()
+queues_db.listeners.append(service_columns.queue_changed)
+
+
+def rebuild_service_columns() -> None:
+    service_columns.load(queues_db.filter(ordered=True, status=QueueStatus.COMPLETED))
+
+
+persistence.on_load(rebuild_service_columns)
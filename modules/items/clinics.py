@@ -1,20 +1,20 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Iterator, Tuple
 from datetime import datetime
 from modules.schema.schemas import Clinic
+from modules.items.sequences import get_sequence
+from modules.items.pagination import take
+from modules.items.table import Table, Index
+from modules.items.records import trusted
+from modules.items.repository import make_table
 
-clinics_db: Dict[str, Clinic] = {}
+clinics_db: Table[Clinic] = make_table("clinics", Clinic, [Index("is_active")])
+clinic_ids = get_sequence("clinic")
+build_clinic = trusted(Clinic)
 
 def create_clinic(name: str, description: Optional[str] = None) -> Clinic:
+    clinic_id = f"clinic-{clinic_ids.next():03d}"
 
-    if clinics_db:
-        last_nums = [int(clinic_id.split('-')[1]) for clinic_id in clinics_db.keys() if clinic_id.startswith('clinic-')]
-        next_num = max(last_nums) + 1 if last_nums else 1
-    else:
-        next_num = 1
-    
-    clinic_id = f"clinic-{next_num:03d}"
-
-    clinic = Clinic(
+    clinic = build_clinic(
         id=clinic_id,
         name=name,
         description=description,
@@ -22,43 +22,40 @@ def create_clinic(name: str, description: Optional[str] = None) -> Clinic:
         created_at=datetime.now().isoformat()
     )
     
-    clinics_db[clinic.id] = clinic
-    return clinic
+    return clinics_db.insert(clinic)
 
 
 def read_clinic(clinic_id: str) -> Optional[Clinic]:
     return clinics_db.get(clinic_id)
 
 
-def read_all_clinics(is_active: Optional[bool] = None) -> List[Clinic]:
-    clinics = list(clinics_db.values())
-    if is_active is not None:
-        clinics = [c for c in clinics if c.is_active == is_active]
-    return clinics
+def iter_clinics(is_active: Optional[bool] = None, after: Optional[int] = None) -> Iterator[Clinic]:
+    return clinics_db.filter(ordered=True, is_active=is_active, after=after)
+
+
+def read_all_clinics(is_active: Optional[bool] = None,
+                     limit: Optional[int] = None,
+                     after: Optional[Tuple[int]] = None) -> List[Clinic]:
+    return take(iter_clinics(is_active, after[0] if after else None), limit)
+
+
+def cursor_of(clinic: Clinic) -> Tuple[int]:
+    return (clinics_db.seq_of(clinic.id),)
+
+
+def count_clinics(is_active: Optional[bool] = None) -> int:
+    return clinics_db.count(is_active=is_active)
 
 
 def update_clinic(clinic_id: str, **kwargs) -> Optional[Clinic]:
-    clinic = clinics_db.get(clinic_id)
-    if not clinic:
-        return None
-    
-    
-    for key, value in kwargs.items():
-        if hasattr(clinic, key) and value is not None:
-            setattr(clinic, key, value)
-    
-    return clinic
+    return clinics_db.update(clinic_id, **kwargs)
 
 
 def delete_clinic(clinic_id: str) -> bool:
     
-    from modules.items.doctors import doctors_db
+    from modules.items.doctors import count_clinic_doctors
 
-    doctors_in_clinic = [d for d in doctors_db.values() if d.clinic_id == clinic_id]
-    if doctors_in_clinic:
+    if count_clinic_doctors(clinic_id):
         raise ValueError("Tidak dapat menghapus klinik yang masih memiliki dokter")
     
-    if clinic_id in clinics_db:
-        del clinics_db[clinic_id]
-        return True
-    return False
\ No newline at end of file
+    return clinics_db.delete(clinic_id) is not None
\ No newline at end of file
@@ -1,9 +1,21 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Iterator, Tuple
 from datetime import datetime
 from modules.schema.schemas import Doctor
+from modules.items.sequences import get_sequence
+from modules.items.pagination import take
+from modules.items.table import Table, Index
+from modules.items.records import trusted
+from modules.items.repository import make_table
 
 
-doctors_db: Dict[str, Doctor] = {}
+doctors_db: Table[Doctor] = make_table("doctors", Doctor, [
+    Index("clinic_id"),
+    Index("is_available"),
+    Index("clinic_availability", ("clinic_id", "is_available")),
+])
+doctor_ids = get_sequence("doctor")
+build_doctor = trusted(Doctor)
+
 
 def create_doctor(name: str, specialization: str, clinic_id: str, phone: str) -> Doctor:
     
@@ -13,15 +25,9 @@ def create_doctor(name: str, specialization: str, clinic_id: str, phone: str) ->
     if not clinic:
         raise ValueError("Klinik tidak ditemukan")
     
-    if doctors_db:
-        last_nums = [int(doctor_id.split('-')[1]) for doctor_id in doctors_db.keys() if doctor_id.startswith('doctor-')]
-        next_num = max(last_nums) + 1 if last_nums else 1
-    else:
-        next_num = 1
-    
-    doctor_id = f"doctor-{next_num:03d}"
+    doctor_id = f"doctor-{doctor_ids.next():03d}"
 
-    doctor = Doctor(
+    doctor = build_doctor(
         id=doctor_id,
         name=name,
         specialization=specialization,
@@ -32,23 +38,35 @@ def create_doctor(name: str, specialization: str, clinic_id: str, phone: str) ->
         created_at=datetime.now().isoformat()
     )
     
-    doctors_db[doctor.id] = doctor
-    return doctor
+    return doctors_db.insert(doctor)
 
 
 def read_doctor(doctor_id: str) -> Optional[Doctor]:
     return doctors_db.get(doctor_id)
 
 
-def read_all_doctors(clinic_id: Optional[str] = None, is_available: Optional[bool] = None) -> List[Doctor]:
-    doctors = list(doctors_db.values())
-    
-    if clinic_id:
-        doctors = [d for d in doctors if d.clinic_id == clinic_id]
-    if is_available is not None:
-        doctors = [d for d in doctors if d.is_available == is_available]
-    
-    return doctors
+def iter_doctors(clinic_id: Optional[str] = None, is_available: Optional[bool] = None,
+                 after: Optional[int] = None) -> Iterator[Doctor]:
+    return doctors_db.filter(ordered=True, clinic_id=clinic_id, is_available=is_available, after=after)
+
+
+def read_all_doctors(clinic_id: Optional[str] = None,
+                     is_available: Optional[bool] = None,
+                     limit: Optional[int] = None,
+                     after: Optional[Tuple[int]] = None) -> List[Doctor]:
+    return take(iter_doctors(clinic_id, is_available, after[0] if after else None), limit)
+
+
+def cursor_of(doctor: Doctor) -> Tuple[int]:
+    return (doctors_db.seq_of(doctor.id),)
+
+
+def count_doctors(clinic_id: Optional[str] = None, is_available: Optional[bool] = None) -> int:
+    return doctors_db.count(clinic_id=clinic_id, is_available=is_available)
+
+
+def count_clinic_doctors(clinic_id: str) -> int:
+    return doctors_db.count(clinic_id=clinic_id)
 
 
 def update_doctor(doctor_id: str, **kwargs) -> Optional[Doctor]:
@@ -63,15 +81,8 @@ def update_doctor(doctor_id: str, **kwargs) -> Optional[Doctor]:
             raise ValueError("Klinik tidak ditemukan")
         kwargs["clinic_name"] = clinic.name
     
-    for key, value in kwargs.items():
-        if hasattr(doctor, key) and value is not None:
-            setattr(doctor, key, value)
-    
-    return doctor
+    return doctors_db.update(doctor_id, **kwargs)
 
 
 def delete_doctor(doctor_id: str) -> bool:
-    if doctor_id in doctors_db:
-        del doctors_db[doctor_id]
-        return True
-    return False
\ No newline at end of file
+    return doctors_db.delete(doctor_id) is not None
\ No newline at end of file
@@ -0,0 +1,10 @@
+from itertools import islice
+from typing import Iterable, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def take(rows: Iterable[T], limit: Optional[int] = None) -> List[T]:
+    if limit is None:
+        return list(rows)
+    return list(islice(rows, limit))
@@ -0,0 +1,102 @@
+import os
+import hmac
+import base64
+import asyncio
+import hashlib
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+SCRYPT_N = int(os.getenv("HOSPITAL_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = 8
+SCRYPT_P = 1
+HASH_WORKERS = int(os.getenv("HOSPITAL_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+HASH_QUEUE_LIMIT = int(os.getenv("HOSPITAL_HASH_QUEUE", "64"))
+
+
+class HashingBusy(Exception):
+    """Raised when more password hashes are pending than the queue allows."""
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * n * r * 2, dklen=32)
+
+
+def hash_password(password: str) -> str:
+    """Salted scrypt hash encoded as ``scrypt$n$r$p$salt$hash``."""
+    salt = secrets.token_bytes(16)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return "$".join([
+        "scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+        base64.b64encode(salt).decode(), base64.b64encode(digest).decode()
+    ])
+
+
+# Checked instead of a real hash when there is none, so an unknown email
+# costs the same scrypt work as a wrong password and timing does not tell them apart.
+DUMMY_HASH = "$".join([
+    "scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P),
+    base64.b64encode(bytes(16)).decode(), base64.b64encode(bytes(32)).decode()
+])
+
+
+def is_legacy(stored: str) -> bool:
+    return "$" not in stored
+
+
+def needs_upgrade(stored: str) -> bool:
+    if is_legacy(stored):
+        return True
+    _, n, r, p, _, _ = stored.split("$")
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def check_password(stored: str, password: str) -> bool:
+    if is_legacy(stored):
+        return hmac.compare_digest(stored, hashlib.sha256(password.encode()).hexdigest())
+    _, n, r, p, salt, digest = stored.split("$")
+    computed = _scrypt(password, base64.b64decode(salt), int(n), int(r), int(p))
+    return hmac.compare_digest(computed, base64.b64decode(digest))
+
+
+class HashingPool:
+    """Runs KDF calls on a fixed set of worker threads off the event loop.
+
+    At most ``workers`` hashes run at once; up to ``queue_limit`` calls may
+    be pending in total, after which callers get ``HashingBusy`` instead of
+    piling onto an ever-growing backlog.
+    """
+
+    def __init__(self, workers: int = HASH_WORKERS, queue_limit: int = HASH_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.pending = 0
+        self.rejected = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args) -> T:
+        if self.pending >= self.queue_limit:
+            self.rejected += 1
+            raise HashingBusy("Server sedang sibuk, coba lagi")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hashing_pool = HashingPool()
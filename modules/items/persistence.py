@@ -0,0 +1,250 @@
+import json
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from modules.items.sequences import sequences, get_sequence
+from modules.items.records import row_codec
+
+
+JOURNAL_PREFIX = "journal-"
+SNAPSHOT_FILE = "snapshot.jsonl"
+
+
+class Store:
+    def __init__(self, name: str,
+                 items: Callable[[], Iterable[Tuple[str, Any]]],
+                 load: Callable[[Dict[str, Any]], None],
+                 encode: Callable[[Any], Any] = lambda value: value):
+        self.name = name
+        self.items = items
+        self.load = load
+        self.encode = encode
+
+
+stores: Dict[str, Store] = {}
+loaders: List[Callable[[], None]] = []
+journal: Optional["Journal"] = None
+
+
+def _segment_path(directory: str, segment: int) -> str:
+    return os.path.join(directory, f"{JOURNAL_PREFIX}{segment:06d}.log")
+
+
+def _segments(directory: str) -> List[int]:
+    return sorted(int(name[len(JOURNAL_PREFIX):-4]) for name in os.listdir(directory)
+                  if name.startswith(JOURNAL_PREFIX) and name.endswith(".log"))
+
+
+def _line(store: str, key: str, value: Any) -> bytes:
+    return (json.dumps({"s": store, "k": key, "v": value}, separators=(",", ":")) + "\n").encode()
+
+
+class Journal:
+    """Append-only write-ahead journal with group-commit fsync.
+
+    ``append`` only buffers; a background thread writes and fsyncs whatever
+    accumulated every ``flush_interval`` seconds, so a burst of mutations
+    costs one fsync. The mutation is acknowledged before that, so a crash
+    loses at most the last ``flush_interval`` plus one fsync of acknowledged
+    changes. Every ``snapshot_every`` records the journal rotates to
+    a new segment and a snapshot of all stores is written in the background,
+    after which older segments are removed.
+    """
+
+    def __init__(self, directory: str, segment: int,
+                 flush_interval: float = 0.005, snapshot_every: int = 100_000):
+        self.directory = directory
+        self.segment = segment
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self.records_since_snapshot = 0
+        self._pending: List[bytes] = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._file = open(_segment_path(directory, segment), "ab")
+        self._closed = threading.Event()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._flusher = threading.Thread(target=self._run, name="journal-flusher", daemon=True)
+        self._flusher.start()
+
+    def append(self, line: bytes) -> None:
+        with self._lock:
+            self._pending.append(line)
+            self.records_since_snapshot += 1
+            due = self.records_since_snapshot >= self.snapshot_every
+        if due:
+            self.snapshot()
+
+    def _run(self) -> None:
+        while not self._closed.wait(self.flush_interval):
+            self.flush()
+
+    def _write_pending(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._file.write(b"".join(batch))
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def flush(self) -> None:
+        with self._io_lock:
+            self._write_pending()
+
+    def snapshot(self) -> None:
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            return
+        with self._io_lock:
+            self._write_pending()
+            self._file.close()
+            self.segment += 1
+            self._file = open(_segment_path(self.directory, self.segment), "ab")
+            with self._lock:
+                self.records_since_snapshot = 0
+
+        state = {name: list(store.items()) for name, store in stores.items()}
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot, args=(state, self.segment),
+            name="journal-snapshot", daemon=True
+        )
+        self._snapshot_thread.start()
+
+    def _write_snapshot(self, state: Dict[str, List[Tuple[str, Any]]], next_segment: int) -> None:
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(path + ".tmp", "wb") as f:
+            f.write((json.dumps({"next_segment": next_segment}) + "\n").encode())
+            for name, items in state.items():
+                encode = stores[name].encode
+                f.writelines(_line(name, key, encode(value)) for key, value in items)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(path + ".tmp", path)
+        for segment in _segments(self.directory):
+            if segment < next_segment:
+                os.remove(_segment_path(self.directory, segment))
+
+    def close(self) -> None:
+        self._closed.set()
+        self._flusher.join()
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        with self._io_lock:
+            self._write_pending()
+            self._file.close()
+
+
+def record(store: str, key: str, value: Any) -> None:
+    if journal is None:
+        return
+    encoded = None if value is None else stores[store].encode(value)
+    journal.append(_line(store, key, encoded))
+
+
+def register_table(table, model) -> None:
+    codec = row_codec(model)
+    stores[table.name] = Store(
+        table.name,
+        items=lambda: list(table.items()),
+        load=lambda rows: table.load(codec.decode(row) for row in rows.values()),
+        encode=codec.encode
+    )
+    table.listeners.append(lambda key, row: record(table.name, key, row))
+
+
+def register_dict(name: str, mapping: Dict[str, Any],
+                  encode: Callable[[Any], Any] = lambda value: value,
+                  decode: Callable[[Any], Any] = lambda value: value) -> None:
+    def load(values: Dict[str, Any]) -> None:
+        mapping.clear()
+        mapping.update((key, decode(value)) for key, value in values.items())
+
+    stores[name] = Store(name, items=lambda: list(mapping.items()), load=load, encode=encode)
+
+
+def on_load(loader: Callable[[], None]) -> None:
+    loaders.append(loader)
+
+
+def _register_sequences() -> None:
+    def load(values: Dict[str, int]) -> None:
+        for name, value in values.items():
+            get_sequence(name).advance_to(value)
+
+    stores["sequences"] = Store(
+        "sequences",
+        items=lambda: [(name, seq.current) for name, seq in sequences.items()],
+        load=load
+    )
+    for seq in sequences.values():
+        if record_sequence not in seq.listeners:
+            seq.listeners.append(record_sequence)
+
+
+def record_sequence(name: str, value: int) -> None:
+    record("sequences", name, value)
+
+
+def _replay(path: str, state: Dict[str, Dict[str, Any]], skip_header: bool = False) -> None:
+    with open(path, "rb") as f:
+        if skip_header:
+            f.readline()
+        for raw in f:
+            try:
+                entry = json.loads(raw)
+            except ValueError:
+                break
+            values = state.setdefault(entry["s"], {})
+            if entry["v"] is None:
+                values.pop(entry["k"], None)
+            else:
+                values[entry["k"]] = entry["v"]
+
+
+def open_journal(directory: str, flush_interval: float = 0.005, snapshot_every: int = 100_000) -> Journal:
+    global journal
+    if journal is not None:
+        return journal
+
+    os.makedirs(directory, exist_ok=True)
+    _register_sequences()
+
+    state: Dict[str, Dict[str, Any]] = {}
+    next_segment = 1
+    snapshot_path = os.path.join(directory, SNAPSHOT_FILE)
+    if os.path.exists(snapshot_path):
+        with open(snapshot_path, "rb") as f:
+            next_segment = json.loads(f.readline())["next_segment"]
+        _replay(snapshot_path, state, skip_header=True)
+
+    segments = [segment for segment in _segments(directory) if segment >= next_segment]
+    for segment in segments:
+        _replay(_segment_path(directory, segment), state)
+
+    for name, values in state.items():
+        if name in stores:
+            stores[name].load(values)
+    for loader in loaders:
+        loader()
+
+    journal = Journal(directory, max(segments + [next_segment - 1]) + 1,
+                      flush_interval=flush_interval, snapshot_every=snapshot_every)
+    return journal
+
+
+def open_journal_from_env() -> Optional[Journal]:
+    directory = os.getenv("HOSPITAL_DATA_DIR")
+    if not directory:
+        return None
+    return open_journal(
+        directory,
+        flush_interval=float(os.getenv("HOSPITAL_JOURNAL_FLUSH_MS", "5")) / 1000,
+        snapshot_every=int(os.getenv("HOSPITAL_SNAPSHOT_EVERY", "100000"))
+    )
+
+
+def close_journal() -> None:
+    global journal
+    if journal is not None:
+        journal.close()
+        journal = None
@@ -1,13 +1,189 @@
 import uuid
-from typing import Optional, List, Dict
-from datetime import datetime
+from typing import Optional, List, Dict, Tuple, Iterator, MutableMapping, Callable
 from modules.schema.schemas import Queue, QueueStatus
+from modules.items.pagination import take
+from modules.items.table import Table, Index
+from modules.items.records import CompactRecord, epoch_now
+from modules.items.repository import make_table, make_mapping
+from modules.items import persistence
 
 
-queues_db: Dict[str, Queue] = {}  
-queue_counters: Dict[str, int] = {} 
+class WaitingLine:
+    """Waiting queues of a single clinic in arrival order.
 
-def create_queue(patient_id: str, patient_name: str, clinic_id: str, doctor_id: Optional[str] = None) -> Queue:
+    Each queue takes the next arrival slot; a Fenwick tree over the slots
+    answers positions in O(log n) and the waiting total in O(1). Removed
+    queues leave dead slots behind: ``_head`` skips the ones at the front
+    and the slots are renumbered once dead ones outnumber live ones, so
+    memory and iteration follow the waiting queues, not the clinic's history.
+    """
+
+    def __init__(self):
+        self._slots: List[str] = []
+        self._tree: List[int] = [0]
+        self._slot_of: Dict[str, int] = {}
+        self._head = 0
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, queue_id: str) -> bool:
+        return queue_id in self._slot_of
+
+    def _prefix(self, slot: int) -> int:
+        total = 0
+        while slot > 0:
+            total += self._tree[slot]
+            slot -= slot & -slot
+        return total
+
+    def _add(self, slot: int, delta: int) -> None:
+        while slot < len(self._tree):
+            self._tree[slot] += delta
+            slot += slot & -slot
+
+    def _live(self, index: int) -> bool:
+        return self._slot_of.get(self._slots[index]) == index + 1
+
+    def _skip_dead(self) -> None:
+        while self._head < len(self._slots) and not self._live(self._head):
+            self._head += 1
+
+    def _compact(self) -> None:
+        self._slots = [queue_id for index, queue_id in enumerate(self._slots) if self._live(index)]
+        # every live slot counts one, so node i of the tree covers lowbit(i) of them
+        self._tree = [slot & -slot for slot in range(len(self._slots) + 1)]
+        self._slot_of = {queue_id: slot for slot, queue_id in enumerate(self._slots, 1)}
+        self._head = 0
+
+    def push(self, queue_id: str) -> None:
+        if queue_id in self._slot_of:
+            return
+        self._slots.append(queue_id)
+        slot = len(self._slots)
+        self._tree.append(1 + self._prefix(slot - 1) - self._prefix(slot - (slot & -slot)))
+        self._slot_of[queue_id] = slot
+
+    def remove(self, queue_id: str) -> bool:
+        slot = self._slot_of.pop(queue_id, None)
+        if slot is None:
+            return False
+        self._add(slot, -1)
+        if len(self._slots) - len(self._slot_of) > len(self._slot_of):
+            self._compact()
+        else:
+            self._skip_dead()
+        return True
+
+    def position(self, queue_id: str) -> int:
+        slot = self._slot_of.get(queue_id)
+        if slot is None:
+            return 0
+        return self._prefix(slot)
+
+    def __iter__(self) -> Iterator[str]:
+        self._skip_dead()
+        slots, slot_of = self._slots, self._slot_of  # a compaction swaps both out
+        for index in range(self._head, len(slots)):
+            queue_id = slots[index]
+            if slot_of.get(queue_id) == index + 1:
+                yield queue_id
+
+    def peek(self) -> Optional[str]:
+        self._skip_dead()
+        return self._slots[self._head] if self._head < len(self._slots) else None
+
+
+class QueueRecord(CompactRecord):
+    """Stored form of a ``Queue``: timestamps are epoch microseconds
+    (``registration_at`` and so on) and clinic and doctor strings are
+    interned, so the many queues of one clinic share them."""
+
+    __slots__ = ("id", "queue_number", "patient_id", "patient_name", "clinic_id", "clinic_name",
+                 "doctor_id", "doctor_name", "status", "registration_at", "called_at",
+                 "service_start_at", "service_end_at", "notes")
+    schema = Queue
+    interned = ("clinic_id", "clinic_name", "doctor_id", "doctor_name")
+    timestamps = {
+        "registration_at": "registration_time",
+        "called_at": "called_time",
+        "service_start_at": "service_start_time",
+        "service_end_at": "service_end_time",
+    }
+
+
+queues_db: Table[QueueRecord] = make_table("queues", QueueRecord, [
+    Index("clinic_id"),
+    Index("status"),
+    Index("patient_id"),
+    Index("clinic_status", ("clinic_id", "status")),
+])
+queue_counters: MutableMapping[str, int] = make_mapping("queue_counters")
+waiting_lines: Dict[str, WaitingLine] = {}
+doctor_lines: Dict[Tuple[str, Optional[str]], WaitingLine] = {}
+queue_stats: Dict[Optional[str], Dict[str, float]] = {}
+queue_listeners: List[Callable[[QueueRecord], None]] = []
+transition_listeners: List[Callable[[QueueRecord, QueueStatus], None]] = []
+
+
+STATUS_COUNTERS = {
+    QueueStatus.WAITING: "waiting",
+    QueueStatus.IN_SERVICE: "in_service",
+    QueueStatus.COMPLETED: "completed",
+    QueueStatus.CANCELLED: "cancelled",
+}
+
+
+def _empty_stats() -> Dict[str, float]:
+    return {
+        "total": 0, "waiting": 0, "in_service": 0, "completed": 0, "cancelled": 0,
+        "service_seconds": 0.0, "service_count": 0
+    }
+
+
+def _service_seconds(queue: QueueRecord) -> Optional[float]:
+    if queue.status != QueueStatus.COMPLETED or queue.service_start_at is None or queue.service_end_at is None:
+        return None
+    return (queue.service_end_at - queue.service_start_at) / 1e6
+
+
+def _count_queue(queue: QueueRecord, delta: int, total: bool = False) -> None:
+    duration = _service_seconds(queue)
+    for key in (queue.clinic_id, None):
+        stats = queue_stats.get(key)
+        if stats is None:
+            stats = queue_stats[key] = _empty_stats()
+        if total:
+            stats["total"] += delta
+        stats[STATUS_COUNTERS[queue.status]] += delta
+        if duration is not None:
+            stats["service_seconds"] += delta * duration
+            stats["service_count"] += delta
+
+
+def _leave_waiting_lines(queue_id: str, key: Tuple[str, Optional[str]]) -> None:
+    if key[0] in waiting_lines:
+        waiting_lines[key[0]].remove(queue_id)
+    if key in doctor_lines:
+        doctor_lines[key].remove(queue_id)
+
+
+def _sync_waiting_line(queue: QueueRecord, previous: Optional[Tuple[str, Optional[str]]] = None) -> None:
+    current = (queue.clinic_id, queue.doctor_id)
+    previous = previous or current
+    if previous != current or queue.status != QueueStatus.WAITING:
+        _leave_waiting_lines(queue.id, previous)
+    if queue.status == QueueStatus.WAITING:
+        waiting_lines.setdefault(queue.clinic_id, WaitingLine()).push(queue.id)
+        doctor_lines.setdefault(current, WaitingLine()).push(queue.id)
+
+
+def _notify_queue(queue: QueueRecord) -> None:
+    for listener in queue_listeners:
+        listener(queue)
+
+
+def create_queue(patient_id: str, patient_name: str, clinic_id: str, doctor_id: Optional[str] = None) -> QueueRecord:
     from modules.items.clinics import clinics_db
     from modules.items.doctors import doctors_db
     clinic = clinics_db.get(clinic_id)
@@ -21,13 +197,12 @@ def create_queue(patient_id: str, patient_name: str, clinic_id: str, doctor_id:
             raise ValueError("Dokter tidak ditemukan atau tidak tersedia")
         doctor_name = doctor.name
     
-    if clinic_id not in queue_counters:
-        queue_counters[clinic_id] = 0
+    counter = queue_counters.get(clinic_id, 0) + 1
+    queue_counters[clinic_id] = counter
+    persistence.record("queue_counters", clinic_id, counter)
+    queue_number = f"{clinic.name[:3].upper()}{counter:03d}"
     
-    queue_counters[clinic_id] += 1
-    queue_number = f"{clinic.name[:3].upper()}{queue_counters[clinic_id]:03d}"
-    
-    queue = Queue(
+    queue = QueueRecord(
         id=str(uuid.uuid4()),
         queue_number=queue_number,
         patient_id=patient_id,
@@ -37,58 +212,92 @@ def create_queue(patient_id: str, patient_name: str, clinic_id: str, doctor_id:
         doctor_id=doctor_id,
         doctor_name=doctor_name,
         status=QueueStatus.WAITING,
-        registration_time=datetime.now().isoformat()
+        registration_at=epoch_now()
     )
     
-    queues_db[queue.id] = queue
+    queues_db.insert(queue)
+    _sync_waiting_line(queue)
+    _count_queue(queue, 1, total=True)
+    _notify_queue(queue)
     return queue
 
 
-def read_queue(queue_id: str) -> Optional[Queue]:
+def read_queue(queue_id: str) -> Optional[QueueRecord]:
     return queues_db.get(queue_id)
 
 
+def iter_queues(clinic_id: Optional[str] = None,
+                status: Optional[QueueStatus] = None,
+                patient_id: Optional[str] = None,
+                after: Optional[int] = None) -> Iterator[QueueRecord]:
+    if clinic_id and status == QueueStatus.WAITING and not patient_id and after is None:
+        return (queues_db[queue_id] for queue_id in waiting_lines.get(clinic_id, ()))
+    return queues_db.filter(ordered=True, clinic_id=clinic_id, status=status, patient_id=patient_id,
+                            after=after)
+
+
 def read_all_queues(clinic_id: Optional[str] = None, 
                     status: Optional[QueueStatus] = None, 
-                    patient_id: Optional[str] = None) -> List[Queue]:
-    queues = list(queues_db.values())
-    
-    if clinic_id:
-        queues = [q for q in queues if q.clinic_id == clinic_id]
-    if status:
-        queues = [q for q in queues if q.status == status]
-    if patient_id:
-        queues = [q for q in queues if q.patient_id == patient_id]
-    
-    queues.sort(key=lambda x: x.registration_time)
-    return queues
+                    patient_id: Optional[str] = None,
+                    limit: Optional[int] = None,
+                    after: Optional[Tuple[int]] = None) -> List[QueueRecord]:
+    return take(iter_queues(clinic_id, status, patient_id, after[0] if after else None), limit)
+
+
+def cursor_of(queue: QueueRecord) -> Tuple[int]:
+    return (queues_db.seq_of(queue.id),)
+
+
+def count_queues(clinic_id: Optional[str] = None,
+                 status: Optional[QueueStatus] = None,
+                 patient_id: Optional[str] = None) -> int:
+    return queues_db.count(clinic_id=clinic_id, status=status, patient_id=patient_id)
 
 
-def update_queue_status(queue_id: str, status: QueueStatus, **kwargs) -> Optional[Queue]:
+def update_queue_status(queue_id: str, status: QueueStatus, **kwargs) -> Optional[QueueRecord]:
     queue = queues_db.get(queue_id)
     if not queue:
         return None
     
-    queue.status = status
+    previous = (queue.clinic_id, queue.doctor_id)
+    previous_status = queue.status
+    _count_queue(queue, -1)
     
     if status == QueueStatus.IN_SERVICE:
-        queue.called_time = datetime.now().isoformat()
-        queue.service_start_time = datetime.now().isoformat()
+        now = epoch_now()
+        kwargs = {"called_at": now, "service_start_at": now, **kwargs}
     elif status == QueueStatus.COMPLETED:
-        queue.service_end_time = datetime.now().isoformat()
-
-    for key, value in kwargs.items():
-        if hasattr(queue, key) and value is not None:
-            setattr(queue, key, value)
+        kwargs = {"service_end_at": epoch_now(), **kwargs}
+    queue = queues_db.update(queue_id, status=status, **kwargs)
     
+    _sync_waiting_line(queue, previous)
+    _count_queue(queue, 1)
+    _notify_queue(queue)
+    for listener in transition_listeners:
+        listener(queue, previous_status)
     return queue
 
 
 def delete_queue(queue_id: str) -> bool:
-    if queue_id in queues_db:
-        del queues_db[queue_id]
-        return True
-    return False
+    queue = queues_db.delete(queue_id)
+    if not queue:
+        return False
+    _leave_waiting_lines(queue_id, (queue.clinic_id, queue.doctor_id))
+    _count_queue(queue, -1, total=True)
+    _notify_queue(queue)
+    return True
+
+
+def read_waiting_queue(patient_id: str) -> Optional[QueueRecord]:
+    return next(iter_queues(patient_id=patient_id, status=QueueStatus.WAITING), None)
+
+
+def read_serving_queue(patient_id: str) -> Optional[QueueRecord]:
+    return next(iter_queues(patient_id=patient_id, status=QueueStatus.IN_SERVICE), None)
+
+
+def read_now_serving(clinic_id: str) -> List[QueueRecord]:
+    return list(queues_db.filter(ordered=True, clinic_id=clinic_id, status=QueueStatus.IN_SERVICE))
 
 
 def get_queue_position(queue_id: str) -> int:
@@ -96,11 +305,64 @@ def get_queue_position(queue_id: str) -> int:
     if not queue or queue.status != QueueStatus.WAITING:
         return 0
     
-    waiting_queues = read_all_queues(
-        clinic_id=queue.clinic_id,
-        status=QueueStatus.WAITING
-    )
-    for i, q in enumerate(waiting_queues, start=1):
-        if q.id == queue_id:
-            return i
-    return 0
\ No newline at end of file
+    line = waiting_lines.get(queue.clinic_id)
+    return line.position(queue_id) if line is not None else 0
+
+
+def get_waiting_count(clinic_id: str) -> int:
+    line = waiting_lines.get(clinic_id)
+    return len(line) if line is not None else 0
+
+
+def rebuild_queue_stats() -> None:
+    queue_stats.clear()
+    for queue in queues_db.values():
+        _count_queue(queue, 1, total=True)
+
+
+def rebuild_queue_indexes() -> None:
+    waiting_lines.clear()
+    doctor_lines.clear()
+    for queue in queues_db.values():
+        _sync_waiting_line(queue)
+    rebuild_queue_stats()
+
+
+persistence.on_load(rebuild_queue_indexes)
+
+
+def read_queue_stats(clinic_id: Optional[str] = None) -> Dict[str, float]:
+    stats = queue_stats.get(clinic_id)
+    if stats is None:
+        return _empty_stats()
+    return dict(stats)
+
+
+def call_next_queue(clinic_id: str, doctor_id: Optional[str] = None) -> Optional[QueueRecord]:
+    kwargs = {}
+    if doctor_id:
+        from modules.items.doctors import doctors_db
+        doctor = doctors_db.get(doctor_id)
+        if not doctor or not doctor.is_available or doctor.clinic_id != clinic_id:
+            raise ValueError("Dokter tidak ditemukan atau tidak tersedia")
+        
+        candidates = []
+        for key in [(clinic_id, doctor_id), (clinic_id, None)]:
+            line = doctor_lines.get(key)
+            head = line.peek() if line is not None else None
+            if head:
+                candidates.append(queues_db[head])
+        if not candidates:
+            return None
+        
+        queue = min(candidates, key=lambda q: q.registration_at)
+        if queue.doctor_id is None:
+            kwargs = {"doctor_id": doctor.id, "doctor_name": doctor.name}
+    else:
+        line = waiting_lines.get(clinic_id)
+        head = line.peek() if line is not None else None
+        if not head:
+            return None
+        queue = queues_db[head]
+    
+    return update_queue_status(queue.id, QueueStatus.IN_SERVICE, **kwargs)
@@ -0,0 +1,170 @@
+import sys
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, ClassVar, Dict, List, NamedTuple, Optional, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+R = TypeVar("R", bound="CompactRecord")
+
+_set = object.__setattr__
+
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def trusted(model: Type[M]) -> Callable[..., M]:
+    """Constructor for records built from values the server produced itself.
+
+    Skips validation entirely: the field-ordered defaults are computed once
+    and merged with the given values, and the instance state is set
+    directly. Use ``model(**values)`` for anything that came from a request.
+    """
+    fields = model.model_fields
+    template: Dict[str, Any] = {
+        name: None if field.is_required() or field.default_factory else field.default
+        for name, field in fields.items()
+    }
+    factories = {name: field.default_factory for name, field in fields.items() if field.default_factory}
+
+    def build(**values) -> M:
+        data = {**template, **values}
+        for name, factory in factories.items():
+            if name not in values:
+                data[name] = factory()
+        row = model.__new__(model)
+        _set(row, "__dict__", data)
+        _set(row, "__pydantic_fields_set__", set(values))
+        _set(row, "__pydantic_extra__", None)
+        _set(row, "__pydantic_private__", None)
+        return row
+
+    return build
+
+
+def to_epoch(value: Optional[str]) -> Optional[int]:
+    """Microseconds since 1970-01-01 of a naive ISO timestamp, read as-is."""
+    if value is None:
+        return None
+    return (datetime.fromisoformat(value) - EPOCH) // MICROSECOND
+
+
+def from_epoch(value: Optional[int]) -> Optional[str]:
+    if value is None:
+        return None
+    return (EPOCH + timedelta(microseconds=value)).isoformat()
+
+
+def epoch_now() -> int:
+    return (datetime.now() - EPOCH) // MICROSECOND
+
+
+class CompactRecord:
+    """Fixed-shape internal row kept in ``__slots__`` instead of a model.
+
+    Subclasses declare their public ``schema``, the slots holding strings
+    shared by many rows (``interned``) and the slots holding timestamps as
+    integer epoch microseconds, mapped to the ISO field they stand for in
+    the schema (``timestamps``). Records only become schema objects or JSON
+    at the API and storage boundary.
+    """
+
+    __slots__ = ()
+    schema: ClassVar[Type[BaseModel]]
+    interned: ClassVar[Tuple[str, ...]] = ()
+    timestamps: ClassVar[Dict[str, str]] = {}
+    _public: ClassVar[List[Tuple[str, str, bool]]]
+    _build: ClassVar[Callable[..., BaseModel]]
+    _stored: ClassVar[List[Tuple[str, Optional[Callable[[Any], Any]]]]]
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {field: slot for slot, field in cls.timestamps.items()}
+        cls._public = [(field, fields.get(field, field), field in fields) for field in cls.schema.model_fields]
+        cls._build = staticmethod(trusted(cls.schema))
+        enums = {fields.get(name, name): _enum_of(field.annotation) for name, field in cls.schema.model_fields.items()}
+        cls._stored = [(slot, sys.intern if slot in cls.interned else enums.get(slot)) for slot in cls.__slots__]
+
+    def __init__(self, **values):
+        for name in self.__slots__:
+            _set(self, name, None)
+        for name, value in values.items():
+            if name in self.interned and value is not None:
+                value = sys.intern(value)
+            setattr(self, name, value)
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({values})"
+
+    def _values(self) -> Dict[str, Any]:
+        return {field: from_epoch(getattr(self, slot)) if epoch else getattr(self, slot)
+                for field, slot, epoch in self._public}
+
+    def to_schema(self) -> BaseModel:
+        return self._build(**self._values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Public JSON form, equal to ``to_schema().model_dump(mode="json")``."""
+        return {field: value.value if isinstance(value, Enum) else value
+                for field, value in self._values().items()}
+
+    @classmethod
+    def from_schema(cls: Type[R], row: BaseModel) -> R:
+        return cls(**{slot: to_epoch(getattr(row, field)) if epoch else getattr(row, field)
+                      for field, slot, epoch in cls._public})
+
+    @classmethod
+    def from_dict(cls: Type[R], data: Dict[str, Any]) -> R:
+        return cls.from_schema(cls.schema.model_validate(data))
+
+    def to_slots(self) -> Dict[str, Any]:
+        """Storage form: the slot values as kept, enums by value."""
+        return {name: value.value if isinstance(value, Enum) else value
+                for name, value in ((name, getattr(self, name)) for name in self.__slots__)}
+
+    @classmethod
+    def from_slots(cls: Type[R], data: Dict[str, Any]) -> R:
+        """Rebuild a record the server stored with ``to_slots``, without
+        validation: only interning strings and restoring enums."""
+        row = cls.__new__(cls)
+        for name, convert in cls._stored:
+            value = data.get(name)
+            _set(row, name, convert(value) if convert is not None and value is not None else value)
+        return row
+
+
+def _enum_of(annotation: Any) -> Optional[Type[Enum]]:
+    for candidate in (annotation, *getattr(annotation, "__args__", ())):
+        if isinstance(candidate, type) and issubclass(candidate, Enum):
+            return candidate
+    return None
+
+
+def _stored_decoder(model: Type[CompactRecord]) -> Callable[[Dict[str, Any]], CompactRecord]:
+    # rows journaled before storage switched to slot values carry the ISO fields
+    legacy = next(iter(model.timestamps.values()), None)
+    if legacy is None:
+        return model.from_slots
+    return lambda data: model.from_dict(data) if legacy in data else model.from_slots(data)
+
+
+class Codec(NamedTuple):
+    fields: List[str]
+    decode: Callable[[Dict[str, Any]], Any]
+    encode: Callable[[Any], Dict[str, Any]]
+
+
+def row_codec(model) -> Codec:
+    """Field names and JSON conversions for rows of ``model``, which is a
+    pydantic model or a ``CompactRecord`` subclass. Compact records are
+    stored by slot, so loading them skips validation and ISO parsing."""
+    if issubclass(model, CompactRecord):
+        return Codec(list(model.__slots__), _stored_decoder(model), model.to_slots)
+    return Codec(list(model.model_fields), model.model_validate, lambda row: row.model_dump(mode="json"))
@@ -0,0 +1,79 @@
+import os
+from typing import Any, Dict, Iterable, MutableMapping, Optional
+
+from modules.items.sequences import sequences, get_sequence
+from modules.items.table import Table, Index
+from modules.items import persistence
+
+STORAGE_BACKEND = os.getenv("HOSPITAL_STORAGE", "memory").lower()
+
+
+def using_sql() -> bool:
+    return STORAGE_BACKEND == "sql"
+
+
+def make_table(name: str, model, indexes: Iterable[Index] = ()):
+    """Store for ``model`` rows: an in-memory ``Table`` or, with
+    ``HOSPITAL_STORAGE=sql``, a ``SqlTable`` over the table of the same name."""
+    if using_sql():
+        from modules.items.sql_table import SqlTable
+        return SqlTable(name, model, indexes)
+    table = Table(name, indexes)
+    persistence.register_table(table, model)
+    return table
+
+
+def make_mapping(name: str) -> MutableMapping[str, Any]:
+    if using_sql():
+        from modules.items.sql_table import SqlMapping
+        return SqlMapping(name)
+    mapping: Dict[str, Any] = {}
+    persistence.register_dict(name, mapping)
+    return mapping
+
+
+sequence_store: Optional[MutableMapping[str, int]] = None
+
+
+def _record_sequence(name: str, value: int) -> None:
+    if sequence_store is not None:
+        sequence_store[name] = value
+
+
+def open_storage() -> None:
+    """Open the configured backend: the optional journal for in-memory
+    storage, or create the schema and restore sequences for SQL.
+
+    Waiting lines, counters, caches and sequences live in the process and
+    are only rebuilt here, on either backend, so more than one worker is
+    refused rather than left to drift apart.
+    """
+    global sequence_store
+    if int(os.getenv("WEB_CONCURRENCY", "1")) > 1:
+        raise RuntimeError("Aplikasi hanya mendukung satu worker (WEB_CONCURRENCY=1)")
+    if not using_sql():
+        persistence.open_journal_from_env()
+        return
+
+    import models
+    from database import get_engine
+    from modules.items.sql_table import SqlMapping
+
+    models.Base.metadata.create_all(get_engine())
+    sequence_store = SqlMapping("sequences")
+    for name, value in sequence_store.items():
+        get_sequence(name).advance_to(value)
+    for seq in sequences.values():
+        if _record_sequence not in seq.listeners:
+            seq.listeners.append(_record_sequence)
+    for loader in persistence.loaders:
+        loader()
+
+
+def close_storage() -> None:
+    if not using_sql():
+        persistence.close_journal()
+        return
+
+    from database import dispose_engine
+    dispose_engine()
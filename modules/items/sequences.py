@@ -0,0 +1,42 @@
+import threading
+from typing import Callable, Dict, List
+
+
+class Sequence:
+    """Monotonic integer allocator; values are never reused, even after deletes."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._value = 0
+        self._lock = threading.Lock()
+        self.listeners: List[Callable[[str, int], None]] = []
+
+    @property
+    def current(self) -> int:
+        return self._value
+
+    def next(self) -> int:
+        with self._lock:
+            self._value += 1
+            value = self._value
+        for listener in self.listeners:
+            listener(self.name, value)
+        return value
+
+    def advance_to(self, value: int) -> None:
+        with self._lock:
+            if value > self._value:
+                self._value = value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._value = 0
+
+
+sequences: Dict[str, Sequence] = {}
+
+
+def get_sequence(name: str) -> Sequence:
+    if name not in sequences:
+        sequences[name] = Sequence(name)
+    return sequences[name]
@@ -0,0 +1,199 @@
+import os
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.schema.schemas import QueueStatus
+from modules.items.queues import QueueRecord, queues_db, transition_listeners
+from modules.items.records import epoch_now
+from modules.items import persistence
+
+HOUR = 3_600_000_000
+WINDOW_HOURS = int(os.getenv("HOSPITAL_SKETCH_WINDOW_HOURS", "24"))
+RELATIVE_ACCURACY = float(os.getenv("HOSPITAL_SKETCH_ACCURACY", "0.01"))
+MAX_BUCKETS = 1024
+MIN_VALUE = 1e-3
+
+Scope = Tuple[str, Optional[str]]
+
+
+class DDSketch:
+    """Mergeable quantile sketch with bounded relative error (DDSketch).
+
+    A value ``x`` is counted in bucket ``ceil(log_gamma(x))`` with
+    ``gamma = (1 + alpha) / (1 - alpha)``, so every quantile is within
+    ``alpha`` of the true value relative to it. Values below ``MIN_VALUE``
+    share one zero bucket. Past ``max_buckets`` the lowest buckets are
+    collapsed into one, trading accuracy on the shortest durations for a
+    fixed size; sketches with the same ``alpha`` merge by adding counts.
+    """
+
+    def __init__(self, alpha: float = RELATIVE_ACCURACY, max_buckets: int = MAX_BUCKETS):
+        self.alpha = alpha
+        self.gamma = (1 + alpha) / (1 - alpha)
+        self._log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float, count: int = 1) -> None:
+        if value < MIN_VALUE:
+            self.zero_count += count
+        else:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[key] = self.buckets.get(key, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        self.count += count
+        self.sum += value * count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def _collapse(self) -> None:
+        keys = sorted(self.buckets)
+        excess = keys[:len(keys) - self.max_buckets]
+        target = keys[len(excess)]
+        self.buckets[target] += sum(self.buckets.pop(key) for key in excess)
+
+    def merge(self, other: "DDSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("Sketch dengan akurasi berbeda tidak dapat digabung")
+        for key, count in other.buckets.items():
+            self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return max(self.min, 0.0)
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                value = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+def merged(sketches: Iterable[DDSketch]) -> DDSketch:
+    total = DDSketch()
+    for sketch in sketches:
+        total.merge(sketch)
+    return total
+
+
+class WaitTimeSketches:
+    """Wait (registration to called) and service (called to completed) time
+    sketches per scope: ``("all", None)``, ``("clinic", id)`` and
+    ``("doctor", id)``.
+
+    Each scope keeps a sketch since start-up and one per hour for the last
+    ``window_hours`` hours, keyed by the hour the step finished in; older
+    hours are dropped as time moves on. Memory is bounded by scopes times
+    windows times ``MAX_BUCKETS``, however many queues are observed.
+    """
+
+    METRICS = ("wait", "service")
+
+    def __init__(self, window_hours: int = WINDOW_HOURS):
+        self.window_hours = window_hours
+        self.totals: Dict[Tuple[str, Scope], DDSketch] = {}
+        self.hourly: Dict[Tuple[str, Scope], Dict[int, DDSketch]] = {}
+        self.latest_hour = 0
+
+    def clear(self) -> None:
+        self.totals.clear()
+        self.hourly.clear()
+        self.latest_hour = 0
+
+    def _advance(self, hour: int) -> None:
+        if hour <= self.latest_hour:
+            return
+        self.latest_hour = hour
+        cutoff = hour - self.window_hours
+        for windows in self.hourly.values():
+            for old in [h for h in windows if h <= cutoff]:
+                del windows[old]
+
+    def observe(self, metric: str, seconds: float, at: int,
+                clinic_id: str, doctor_id: Optional[str]) -> None:
+        hour = at // HOUR
+        self._advance(hour)
+        scopes = [("all", None), ("clinic", clinic_id)]
+        if doctor_id:
+            scopes.append(("doctor", doctor_id))
+        for scope in scopes:
+            key = (metric, scope)
+            total = self.totals.get(key)
+            if total is None:
+                total = self.totals[key] = DDSketch()
+            total.add(seconds)
+            if hour > self.latest_hour - self.window_hours:
+                windows = self.hourly.setdefault(key, {})
+                sketch = windows.get(hour)
+                if sketch is None:
+                    sketch = windows[hour] = DDSketch()
+                sketch.add(seconds)
+
+    def observe_wait(self, queue: QueueRecord) -> None:
+        if queue.called_at is not None:
+            self.observe("wait", (queue.called_at - queue.registration_at) / 1e6,
+                         queue.called_at, queue.clinic_id, queue.doctor_id)
+
+    def observe_service(self, queue: QueueRecord) -> None:
+        if queue.service_start_at is not None and queue.service_end_at is not None:
+            self.observe("service", (queue.service_end_at - queue.service_start_at) / 1e6,
+                         queue.service_end_at, queue.clinic_id, queue.doctor_id)
+
+    def record(self, queue: QueueRecord, previous: QueueStatus) -> None:
+        """Observe the step ``queue`` just finished: being called (wait) or
+        being completed after a call (service)."""
+        if queue.status == QueueStatus.IN_SERVICE and previous == QueueStatus.WAITING:
+            self.observe_wait(queue)
+        elif queue.status == QueueStatus.COMPLETED and previous == QueueStatus.IN_SERVICE:
+            self.observe_service(queue)
+
+    def scopes(self, kind: str) -> List[str]:
+        return sorted({scope[1] for metric, scope in self.totals if scope[0] == kind})
+
+    def sketch(self, metric: str, scope: Scope, hours: Optional[int] = None) -> DDSketch:
+        """Sketch since start-up, or merged over the last ``hours`` hours."""
+        key = (metric, scope)
+        if hours is None:
+            return self.totals.get(key) or DDSketch()
+        since = epoch_now() // HOUR - hours
+        return merged(s for hour, s in self.hourly.get(key, {}).items() if hour > since)
+
+    def windows(self, metric: str, scope: Scope) -> Dict[int, DDSketch]:
+        return dict(sorted(self.hourly.get((metric, scope), {}).items()))
+
+    def stats(self) -> Dict[str, int]:
+        sketches = list(self.totals.values()) + [s for w in self.hourly.values() for s in w.values()]
+        return {"sketches": len(sketches), "buckets": sum(len(s.buckets) for s in sketches)}
+
+
+wait_times = WaitTimeSketches()
+transition_listeners.append(wait_times.record)
+
+
+def rebuild_wait_times() -> None:
+    """Replay the finished steps of stored queues, e.g. after a restart."""
+    wait_times.clear()
+    for queue in queues_db.values():
+        wait_times.observe_wait(queue)
+        if queue.status == QueueStatus.COMPLETED:
+            wait_times.observe_service(queue)
+
+
+persistence.on_load(rebuild_wait_times)
@@ -0,0 +1,289 @@
+import json
+from enum import Enum
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, MutableMapping, Optional, TypeVar
+
+from sqlalchemy import and_, delete, func, insert, select, true, update
+from sqlalchemy.exc import IntegrityError
+
+from modules.items.table import Index, assign
+from modules.items.records import row_codec
+
+T = TypeVar("T")
+
+
+def _value(value: Any) -> Any:
+    return value.value if isinstance(value, Enum) else value
+
+
+def _engine(engine):
+    if engine is not None:
+        return engine
+    from database import get_engine
+    return get_engine()
+
+
+class SqlIndex:
+    """Read side of an ``Index`` answered by the matching database index."""
+
+    def __init__(self, table: "SqlTable", index: Index):
+        self.table = table
+        self.index = index
+        self.name = index.name
+        self.fields = index.fields
+
+    def columns(self):
+        if self.index.computed:
+            return [self.table.table.c[f"{self.name}_key"]]
+        return [self.table.table.c[field] for field in self.fields]
+
+    def clause(self, key: Any):
+        columns = self.columns()
+        keys = key if len(columns) > 1 else (key,)
+        return and_(*(column == _value(k) for column, k in zip(columns, keys)))
+
+    def __len__(self) -> int:
+        stmt = select(func.count()).select_from(select(*self.columns()).distinct().subquery())
+        with self.table.engine.connect() as conn:
+            return conn.execute(stmt).scalar_one()
+
+    def get(self, key: Any) -> Dict[str, None]:
+        t = self.table.table
+        stmt = select(t.c.id).where(self.clause(key)).order_by(t.c.seq)
+        with self.table.engine.connect() as conn:
+            return dict.fromkeys(conn.execute(stmt).scalars())
+
+    def keys_between(self, lo: Any = None, hi: Any = None) -> List[Any]:
+        column = self.columns()[0]
+        stmt = select(column).distinct().order_by(column)
+        if lo is not None:
+            stmt = stmt.where(column >= lo)
+        if hi is not None:
+            stmt = stmt.where(column <= hi)
+        with self.table.engine.connect() as conn:
+            return list(conn.execute(stmt).scalars())
+
+
+class SqlTable(Generic[T]):
+    """``Table`` with the same interface, backed by a SQL table via SQLAlchemy.
+
+    Rows are stored column per field plus an autoincrement ``seq`` that keeps
+    insertion order; computed indexes are stored in a ``<index>_key`` column.
+    Scans page through ``seq`` in batches instead of holding a cursor open.
+    """
+
+    def __init__(self, name: str, model, indexes: Iterable[Index] = (),
+                 table=None, engine=None, batch_size: int = 500):
+        if table is None:
+            import models
+            table = models.Base.metadata.tables[name]
+        self.name = name
+        self.model = model
+        self.table = table
+        self.indexes: Dict[str, Index] = {index.name: index for index in indexes}
+        self.batch_size = batch_size
+        self.listeners: List[Callable[[str, Optional[T]], None]] = []
+        self._engine = engine
+        self._codec = row_codec(model)
+
+    @property
+    def engine(self):
+        return _engine(self._engine)
+
+    def _encode(self, row: T) -> Dict[str, Any]:
+        values = self._codec.encode(row)
+        for index in self.indexes.values():
+            if index.computed:
+                values[f"{index.name}_key"] = index.key_of(row)
+        return values
+
+    def _decode(self, record) -> T:
+        return self._codec.decode({field: record[field] for field in self._codec.fields})
+
+    def _where(self, criteria: Dict[str, Any]):
+        return and_(true(), *(self.table.c[k] == _value(v) for k, v in criteria.items()))
+
+    def _scan(self, clause, after: Optional[int] = None) -> Iterator[T]:
+        t = self.table
+        last = after if after is not None else 0
+        while True:
+            stmt = select(t).where(clause, t.c.seq > last).order_by(t.c.seq).limit(self.batch_size)
+            with self.engine.connect() as conn:
+                records = conn.execute(stmt).mappings().all()
+            for record in records:
+                yield self._decode(record)
+            if len(records) < self.batch_size:
+                return
+            last = records[-1]["seq"]
+
+    def _one(self, clause) -> Optional[T]:
+        stmt = select(self.table).where(clause).order_by(self.table.c.seq).limit(1)
+        with self.engine.connect() as conn:
+            record = conn.execute(stmt).mappings().first()
+        return self._decode(record) if record is not None else None
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def __contains__(self, row_id: str) -> bool:
+        stmt = select(self.table.c.id).where(self.table.c.id == row_id)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).first() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __getitem__(self, row_id: str) -> T:
+        row = self.get(row_id)
+        if row is None:
+            raise KeyError(row_id)
+        return row
+
+    def get(self, row_id: str, default: Optional[T] = None) -> Optional[T]:
+        row = self._one(self.table.c.id == row_id)
+        return row if row is not None else default
+
+    def keys(self) -> List[str]:
+        stmt = select(self.table.c.id).order_by(self.table.c.seq)
+        with self.engine.connect() as conn:
+            return list(conn.execute(stmt).scalars())
+
+    def values(self) -> Iterator[T]:
+        return self._scan(true())
+
+    def items(self) -> Iterator:
+        return ((row.id, row) for row in self.values())
+
+    def index(self, name: str) -> SqlIndex:
+        return SqlIndex(self, self.indexes[name])
+
+    def seq_of(self, row_id: str) -> Optional[int]:
+        stmt = select(self.table.c.seq).where(self.table.c.id == row_id)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar()
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table))
+
+    def _notify(self, row_id: str, row: Optional[T]) -> None:
+        for listener in self.listeners:
+            listener(row_id, row)
+
+    def _insert_many(self, rows: List[T]) -> None:
+        try:
+            with self.engine.begin() as conn:
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start:start + self.batch_size]
+                    conn.execute(insert(self.table), [self._encode(row) for row in batch])
+        except IntegrityError:
+            raise ValueError(f"Nilai duplikat pada tabel {self.name}")
+
+    def load(self, rows: Iterable[T]) -> None:
+        self.clear()
+        self._insert_many(list(rows))
+
+    def insert(self, row: T) -> T:
+        self._insert_many([row])
+        self._notify(row.id, row)
+        return row
+
+    def insert_many(self, rows: Iterable[T]) -> List[T]:
+        rows = list(rows)
+        self._insert_many(rows)
+        for row in rows:
+            self._notify(row.id, row)
+        return rows
+
+    def update(self, row_id: str, **changes) -> Optional[T]:
+        row = self.get(row_id)
+        if row is None:
+            return None
+
+        changes = {k: v for k, v in changes.items() if hasattr(row, k) and v is not None}
+        assign(row, changes)
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(update(self.table).where(self.table.c.id == row_id).values(self._encode(row)))
+        except IntegrityError:
+            raise ValueError(f"Nilai duplikat pada tabel {self.name}")
+        self._notify(row_id, row)
+        return row
+
+    def delete(self, row_id: str) -> Optional[T]:
+        row = self.get(row_id)
+        if row is None:
+            return None
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.id == row_id))
+        self._notify(row_id, None)
+        return row
+
+    def lookup(self, index_name: str, key: Any) -> Iterator[T]:
+        return self._scan(self.index(index_name).clause(key))
+
+    def first(self, index_name: str, key: Any) -> Optional[T]:
+        return self._one(self.index(index_name).clause(key))
+
+    def filter(self, ordered: bool = False, after: Optional[int] = None, **criteria) -> Iterator[T]:
+        criteria = {k: v for k, v in criteria.items() if v is not None}
+        return self._scan(self._where(criteria), after)
+
+    def count(self, **criteria) -> int:
+        criteria = {k: v for k, v in criteria.items() if v is not None}
+        stmt = select(func.count()).select_from(self.table).where(self._where(criteria))
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar_one()
+
+
+class SqlMapping(MutableMapping):
+    """Dict stand-in over one store of the ``key_values`` table (JSON values)."""
+
+    def __init__(self, store: str, table=None, engine=None):
+        if table is None:
+            import models
+            table = models.KeyValueRow.__table__
+        self.store = store
+        self.table = table
+        self._engine = engine
+
+    @property
+    def engine(self):
+        return _engine(self._engine)
+
+    def _where(self, key: str):
+        return and_(self.table.c.store == self.store, self.table.c.key == key)
+
+    def __getitem__(self, key: str) -> Any:
+        stmt = select(self.table.c.value).where(self._where(key))
+        with self.engine.connect() as conn:
+            value = conn.execute(stmt).scalar()
+        if value is None:
+            raise KeyError(key)
+        return json.loads(value)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        encoded = json.dumps(value)
+        with self.engine.begin() as conn:
+            result = conn.execute(update(self.table).where(self._where(key)).values(value=encoded))
+            if result.rowcount == 0:
+                conn.execute(insert(self.table).values(store=self.store, key=key, value=encoded))
+
+    def __delitem__(self, key: str) -> None:
+        with self.engine.begin() as conn:
+            result = conn.execute(delete(self.table).where(self._where(key)))
+        if result.rowcount == 0:
+            raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        stmt = select(self.table.c.key).where(self.table.c.store == self.store)
+        with self.engine.connect() as conn:
+            return iter(list(conn.execute(stmt).scalars()))
+
+    def __len__(self) -> int:
+        stmt = select(func.count()).select_from(self.table).where(self.table.c.store == self.store)
+        with self.engine.connect() as conn:
+            return conn.execute(stmt).scalar_one()
+
+    def clear(self) -> None:
+        with self.engine.begin() as conn:
+            conn.execute(delete(self.table).where(self.table.c.store == self.store))
@@ -0,0 +1,307 @@
+import bisect
+from typing import Any, Callable, Dict, Generic, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+def assign(row: Any, changes: Dict[str, Any]) -> None:
+    """Apply trusted field changes without going through validation.
+
+    Pydantic rows are updated through their ``__dict__`` directly, skipping
+    ``BaseModel.__setattr__``; other records fall back to ``setattr``.
+    """
+    fields_set = getattr(row, "__pydantic_fields_set__", None)
+    if fields_set is None:
+        for key, value in changes.items():
+            setattr(row, key, value)
+        return
+    row.__dict__.update(changes)
+    fields_set.update(changes)
+
+
+class Index:
+    """Secondary index mapping a key to the ids of the rows that carry it.
+
+    The key is a single field value, a tuple for composite indexes, or the
+    result of ``key`` for computed indexes. Ordered indexes also keep their
+    distinct keys sorted so ranges can be answered with bisect. When the
+    owning table passes each row's insertion ``seq``, every bucket also keeps
+    those seqs sorted, so its rows can be walked in insertion order without
+    sorting the bucket.
+    """
+
+    def __init__(self, name: str, fields: Tuple[str, ...] = (),
+                 key: Optional[Callable[[Any], Any]] = None,
+                 unique: bool = False, ordered: bool = False):
+        self.name = name
+        self.fields = fields or (name,)
+        self.unique = unique
+        self.ordered = ordered
+        self.computed = key is not None
+        if key is None:
+            if len(self.fields) == 1:
+                field = self.fields[0]
+                key = lambda row: getattr(row, field)
+            else:
+                key = lambda row: tuple(getattr(row, f) for f in self.fields)
+        self.key_of = key
+        self.buckets: Dict[Any, Dict[str, None]] = {}
+        self.seqs: Dict[Any, List[int]] = {}
+        self.sorted_keys: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.buckets)
+
+    def key_for(self, criteria: Dict[str, Any]) -> Any:
+        if len(self.fields) == 1:
+            return criteria[self.fields[0]]
+        return tuple(criteria[f] for f in self.fields)
+
+    def get(self, key: Any) -> Dict[str, None]:
+        return self.buckets.get(key, {})
+
+    def add(self, row_id: str, key: Any, seq: Optional[int] = None) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = {}
+            self.seqs[key] = []
+            if self.ordered:
+                bisect.insort(self.sorted_keys, key)
+        elif self.unique and bucket and row_id not in bucket:
+            raise ValueError(f"Nilai duplikat pada indeks {self.name}")
+        if row_id in bucket:
+            return
+        bucket[row_id] = None
+        if seq is not None:
+            bisect.insort(self.seqs[key], seq)
+
+    def discard(self, row_id: str, key: Any, seq: Optional[int] = None) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is None or row_id not in bucket:
+            return
+        del bucket[row_id]
+        seqs = self.seqs[key]
+        if seq is not None:
+            del seqs[bisect.bisect_left(seqs, seq)]
+        if not bucket:
+            del self.buckets[key]
+            del self.seqs[key]
+            if self.ordered:
+                del self.sorted_keys[bisect.bisect_left(self.sorted_keys, key)]
+
+    def keys_between(self, lo: Any = None, hi: Any = None) -> List[Any]:
+        start = bisect.bisect_left(self.sorted_keys, lo) if lo is not None else 0
+        end = bisect.bisect_right(self.sorted_keys, hi) if hi is not None else len(self.sorted_keys)
+        return self.sorted_keys[start:end]
+
+    def clear(self) -> None:
+        self.buckets.clear()
+        self.seqs.clear()
+        self.sorted_keys.clear()
+
+
+class Table(Generic[T]):
+    """In-memory store keyed by ``row.id`` with maintained secondary indexes.
+
+    Reads behave like the plain dicts the item modules used before; writes go
+    through ``insert``, ``update`` and ``delete`` so every index stays in sync.
+    """
+
+    def __init__(self, name: str, indexes: Iterable[Index] = ()):
+        self.name = name
+        self.indexes: Dict[str, Index] = {index.name: index for index in indexes}
+        self._rows: Dict[str, T] = {}
+        self._seq: Dict[str, int] = {}
+        self._id_at: Dict[int, str] = {}
+        self._order: List[int] = []
+        self._next_seq = 0
+        self.listeners: List[Callable[[str, Optional[T]], None]] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, row_id: str) -> bool:
+        return row_id in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __getitem__(self, row_id: str) -> T:
+        return self._rows[row_id]
+
+    def get(self, row_id: str, default: Optional[T] = None) -> Optional[T]:
+        return self._rows.get(row_id, default)
+
+    def keys(self):
+        return self._rows.keys()
+
+    def values(self):
+        return self._rows.values()
+
+    def items(self):
+        return self._rows.items()
+
+    def index(self, name: str) -> Index:
+        return self.indexes[name]
+
+    def seq_of(self, row_id: str) -> Optional[int]:
+        """Insertion position of a row; listings in table order can resume
+        after it even once the row itself is gone."""
+        return self._seq.get(row_id)
+
+    def clear(self) -> None:
+        self._rows.clear()
+        self._seq.clear()
+        self._id_at.clear()
+        self._order.clear()
+        for index in self.indexes.values():
+            index.clear()
+
+    def _notify(self, row_id: str, row: Optional[T]) -> None:
+        for listener in self.listeners:
+            listener(row_id, row)
+
+    def load(self, rows: Iterable[T]) -> None:
+        self.clear()
+        for row in rows:
+            self._insert(row)
+
+    def insert(self, row: T) -> T:
+        self._insert(row)
+        self._notify(row.id, row)
+        return row
+
+    def insert_many(self, rows: Iterable[T]) -> List[T]:
+        rows = list(rows)
+        for row in rows:
+            self.insert(row)
+        return rows
+
+    def _insert(self, row: T) -> None:
+        if row.id in self._rows:
+            raise ValueError(f"Data {row.id} sudah ada")
+        seq = self._next_seq
+        added = []
+        try:
+            for index in self.indexes.values():
+                index.add(row.id, index.key_of(row), seq)
+                added.append(index)
+        except ValueError:
+            for index in added:
+                index.discard(row.id, index.key_of(row), seq)
+            raise
+        self._rows[row.id] = row
+        self._seq[row.id] = seq
+        self._id_at[seq] = row.id
+        self._order.append(seq)
+        self._next_seq += 1
+
+    def update(self, row_id: str, **changes) -> Optional[T]:
+        row = self._rows.get(row_id)
+        if row is None:
+            return None
+
+        changes = {k: v for k, v in changes.items() if hasattr(row, k) and v is not None}
+        seq = self._seq[row_id]
+        old_keys = {name: index.key_of(row) for name, index in self.indexes.items()}
+        previous = {k: getattr(row, k) for k in changes}
+        assign(row, changes)
+
+        moved = []
+        try:
+            for name, index in self.indexes.items():
+                new_key = index.key_of(row)
+                if new_key != old_keys[name]:
+                    index.add(row_id, new_key, seq)
+                    moved.append((index, old_keys[name], new_key))
+        except ValueError:
+            for index, _, new_key in moved:
+                index.discard(row_id, new_key, seq)
+            assign(row, previous)
+            raise
+        for index, old_key, _ in moved:
+            index.discard(row_id, old_key, seq)
+        self._notify(row_id, row)
+        return row
+
+    def delete(self, row_id: str) -> Optional[T]:
+        row = self._rows.pop(row_id, None)
+        if row is None:
+            return None
+        seq = self._seq.pop(row_id)
+        del self._id_at[seq]
+        del self._order[bisect.bisect_left(self._order, seq)]
+        for index in self.indexes.values():
+            index.discard(row_id, index.key_of(row), seq)
+        self._notify(row_id, None)
+        return row
+
+    def lookup(self, index_name: str, key: Any) -> Iterator[T]:
+        return (self._rows[row_id] for row_id in self.indexes[index_name].get(key))
+
+    def first(self, index_name: str, key: Any) -> Optional[T]:
+        return next(self.lookup(index_name, key), None)
+
+    def _plan(self, criteria: Dict[str, Any]) -> Tuple[Optional[Tuple[Index, Any]], List[Dict[str, None]], Dict[str, Any]]:
+        buckets = []
+        covered = set()
+        for index in self.indexes.values():
+            if index.computed or not set(index.fields) <= criteria.keys():
+                continue
+            key = index.key_for(criteria)
+            if len(index.fields) == len(criteria):
+                return (index, key), [], {}
+            buckets.append((index, key))
+            covered.update(index.fields)
+
+        residual = {k: v for k, v in criteria.items() if k not in covered}
+        if not buckets:
+            return None, [], residual
+        buckets.sort(key=lambda bucket: len(bucket[0].get(bucket[1])))
+        return buckets[0], [index.get(key) for index, key in buckets[1:]], residual
+
+    def _in_order(self, seqs: List[int], after: Optional[int] = None) -> Iterator[str]:
+        """Ids at ``seqs`` past ``after`` in order; each step re-seeks past
+        the last seq seen, so rows moving in or out of the list meanwhile are
+        harmless."""
+        last = after if after is not None else -1
+        while True:
+            pos = bisect.bisect_right(seqs, last)
+            if pos == len(seqs):
+                return
+            last = seqs[pos]
+            yield self._id_at[last]
+
+    def filter(self, ordered: bool = False, after: Optional[int] = None, **criteria) -> Iterator[T]:
+        """Rows matching ``criteria``; ``ordered`` yields them in insertion
+        order and ``after`` (a ``seq_of`` value, implies ordered) seeks past
+        that position with bisect."""
+        criteria = {k: v for k, v in criteria.items() if v is not None}
+        candidates, others, residual = self._plan(criteria)
+
+        if candidates is None:
+            ids = self._rows.keys() if after is None else self._in_order(self._order, after)
+        elif ordered or after is not None:
+            index, key = candidates
+            ids = self._in_order(index.seqs.get(key, []), after)
+        else:
+            index, key = candidates
+            ids = index.get(key)
+
+        for row_id in ids:
+            if any(row_id not in bucket for bucket in others):
+                continue
+            row = self._rows[row_id]
+            if any(getattr(row, k) != v for k, v in residual.items()):
+                continue
+            yield row
+
+    def count(self, **criteria) -> int:
+        criteria = {k: v for k, v in criteria.items() if v is not None}
+        if not criteria:
+            return len(self._rows)
+        candidates, others, residual = self._plan(criteria)
+        if candidates is not None and not others and not residual:
+            index, key = candidates
+            return len(index.get(key))
+        return sum(1 for _ in self.filter(**criteria))
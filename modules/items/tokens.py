@@ -0,0 +1,88 @@
+import os
+import hmac
+import json
+import base64
+import hashlib
+import secrets
+from typing import Dict, Optional
+
+MIN_SECRET_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class TokenSigner:
+    """Issues and verifies ``<key id>.<claims>.<signature>`` tokens.
+
+    Claims are compact JSON (``sub`` user id, ``role``, ``exp`` epoch
+    seconds, ``jti`` token id) signed with HMAC-SHA256. New tokens are signed
+    with the active key; every known key is accepted, so keys can be rotated
+    without logging everyone out.
+    """
+
+    def __init__(self, keys: Dict[str, bytes], active: str):
+        if active not in keys:
+            raise ValueError(f"Kunci {active} tidak dikenal")
+        self.keys = dict(keys)
+        self.active = active
+
+    def _sign(self, key_id: str, body: str) -> str:
+        digest = hmac.new(self.keys[key_id], f"{key_id}.{body}".encode(), hashlib.sha256).digest()
+        return _b64encode(digest)
+
+    def issue(self, user_id: str, role: str, expires_at: float) -> str:
+        claims = {"sub": user_id, "role": role, "exp": int(expires_at), "jti": _b64encode(secrets.token_bytes(8))}
+        body = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+        return f"{self.active}.{body}.{self._sign(self.active, body)}"
+
+    def verify(self, token: str, now: float) -> Optional[Dict]:
+        try:
+            key_id, body, signature = token.split(".")
+        except ValueError:
+            return None
+        if key_id not in self.keys or not hmac.compare_digest(signature.encode(), self._sign(key_id, body).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(body))
+        except ValueError:
+            return None
+        if claims["exp"] <= now:
+            return None
+        return claims
+
+    def rotate(self, key_id: str, secret: bytes) -> None:
+        self.keys[key_id] = secret
+        self.active = key_id
+
+    def retire(self, key_id: str) -> None:
+        if key_id == self.active:
+            raise ValueError("Kunci aktif tidak dapat dihapus")
+        self.keys.pop(key_id, None)
+
+
+def signer_from_env(required: bool = False) -> TokenSigner:
+    """Keys come from ``HOSPITAL_TOKEN_KEYS`` as ``id:secret,id:secret``; the
+    first one signs. Entries without an id or with a secret shorter than
+    ``MIN_SECRET_BYTES`` are refused. Without it a random per-process key is used, unless
+    signed tokens are ``required``: every worker must then share the keys."""
+    spec = os.getenv("HOSPITAL_TOKEN_KEYS")
+    if not spec:
+        if required:
+            raise RuntimeError("HOSPITAL_TOKEN_MODE=signed membutuhkan HOSPITAL_TOKEN_KEYS")
+        return TokenSigner({"k0": secrets.token_bytes(32)}, "k0")
+
+    keys = {}
+    for item in spec.split(","):
+        key_id, sep, secret = item.strip().partition(":")
+        if not sep or not key_id or key_id in keys:
+            raise RuntimeError(f"Entri HOSPITAL_TOKEN_KEYS tidak valid: {key_id or item.strip()!r}")
+        if len(secret.encode()) < MIN_SECRET_BYTES:
+            raise RuntimeError(f"Secret kunci {key_id} minimal {MIN_SECRET_BYTES} byte")
+        keys[key_id] = secret.encode()
+    return TokenSigner(keys, next(iter(keys)))
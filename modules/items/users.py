@@ -1,17 +1,51 @@
+import os
+import time
 import uuid
-import hashlib
-from typing import Optional, List, Dict
+import heapq
+from typing import Optional, List, Dict, MutableMapping, Tuple
 from datetime import datetime, timedelta
 from modules.schema.schemas import User, UserRole
+from modules.items.sequences import get_sequence
+from modules.items.table import Table, Index
+from modules.items.records import trusted
+from modules.items.cache import LRUCache
+from modules.items.tokens import signer_from_env
+from modules.items.passwords import hash_password, check_password, needs_upgrade, hashing_pool, DUMMY_HASH
+from modules.items.repository import make_table, make_mapping
+from modules.items import persistence
 
 
-users_db: Dict[str, User] = {}  
-passwords_db: Dict[str, str] = {}  
+def normalize_email(email: str) -> str:
+    return email.strip().lower()
+
+
+users_db: Table[User] = make_table("users", User, [
+    Index("email", key=lambda u: normalize_email(u.email), unique=True),
+    Index("role"),
+])
+passwords_db: MutableMapping[str, str] = make_mapping("passwords")
 sessions_db: Dict[str, Dict] = {}  
+medical_record_numbers = get_sequence("medical_record")
+build_user = trusted(User)
 
-def hash_password(password: str) -> str:
-    
-    return hashlib.sha256(password.encode()).hexdigest()
+MAX_SESSIONS_PER_USER = int(os.getenv("HOSPITAL_MAX_SESSIONS_PER_USER", "10"))
+SESSION_SWEEP_BATCH = 1000
+session_expiry: List[Tuple[datetime, str]] = []
+user_sessions: Dict[str, Dict[str, None]] = {}
+principal_cache = LRUCache(
+    maxsize=int(os.getenv("HOSPITAL_PRINCIPAL_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("HOSPITAL_PRINCIPAL_CACHE_TTL", "60"))
+)
+
+TOKEN_MODE = os.getenv("HOSPITAL_TOKEN_MODE", "session").lower()
+token_signer = signer_from_env(required=TOKEN_MODE == "signed")
+revoked_tokens: MutableMapping[str, int] = make_mapping("revoked_tokens")
+
+persistence.register_dict(
+    "sessions", sessions_db,
+    encode=lambda session: {"user_id": session["user_id"], "expires_at": session["expires_at"].isoformat()},
+    decode=lambda value: {"user_id": value["user_id"], "expires_at": datetime.fromisoformat(value["expires_at"])}
+)
 
 
 def generate_session_token() -> str:
@@ -20,18 +54,18 @@ def generate_session_token() -> str:
 
 
 
-def create_user(name: str, email: str, password: str, phone: str, role: UserRole = UserRole.PATIENT) -> User:
-    if any(u.email == email for u in users_db.values()):
+def create_user(name: str, email: str, password: Optional[str], phone: str, role: UserRole = UserRole.PATIENT,
+                password_hash: Optional[str] = None) -> User:
+    if users_db.first("email", normalize_email(email)):
         raise ValueError("Email sudah terdaftar")
     
     user_id = str(uuid.uuid4())
     
     medical_record_number = None
     if role == UserRole.PATIENT:
-        patient_count = len([u for u in users_db.values() if u.role == UserRole.PATIENT])
-        medical_record_number = f"MR{patient_count + 1:06d}"
+        medical_record_number = f"MR{medical_record_numbers.next():06d}"
     
-    user = User(
+    user = build_user(
         id=user_id,
         name=name,
         email=email,
@@ -41,80 +75,215 @@ def create_user(name: str, email: str, password: str, phone: str, role: UserRole
         created_at=datetime.now().isoformat()
     )
     
-    users_db[user_id] = user
-    passwords_db[user_id] = hash_password(password)
+    users_db.insert(user)
+    _store_password(user_id, password_hash or hash_password(password))
     
     return user
 
 
+def _store_password(user_id: str, password_hash: str) -> None:
+    passwords_db[user_id] = password_hash
+    persistence.record("passwords", user_id, password_hash)
+
+
 def read_user(user_id: str) -> Optional[User]:
     return users_db.get(user_id)
 
 
 def read_user_by_email(email: str) -> Optional[User]:
-    return next((u for u in users_db.values() if u.email == email), None)
+    return users_db.first("email", normalize_email(email))
 
 
 def read_all_users(role: Optional[UserRole] = None) -> List[User]:
-    users = list(users_db.values())
-    if role:
-        users = [u for u in users if u.role == role]
-    return users
+    return list(users_db.filter(role=role))
+
+
+def _invalidate_principals(user_id: str) -> None:
+    for session_token in user_sessions.get(user_id, ()):
+        principal_cache.pop(session_token)
 
 
 def update_user(user_id: str, **kwargs) -> Optional[User]:
-    user = users_db.get(user_id)
-    if not user:
-        return None
-    
-    
-    for key, value in kwargs.items():
-        if hasattr(user, key) and value is not None:
-            setattr(user, key, value)
-    
+    try:
+        user = users_db.update(user_id, **kwargs)
+    except ValueError:
+        raise ValueError("Email sudah terdaftar")
+    _invalidate_principals(user_id)
     return user
 
 
 def delete_user(user_id: str) -> bool:
-    if user_id in users_db:
-        del users_db[user_id]
+    if users_db.delete(user_id):
+        _invalidate_principals(user_id)
         if user_id in passwords_db:
             del passwords_db[user_id]
+            persistence.record("passwords", user_id, None)
+        for session_token in list(user_sessions.get(user_id, ())):
+            _drop_session(session_token)
         return True
     return False
 
 
-def verify_password(user_id: str, password: str) -> bool:
-    return passwords_db.get(user_id) == hash_password(password)
+def verify_password(user_id: Optional[str], password: str) -> bool:
+    """Check ``password``; an unknown ``user_id`` (``None`` for an unknown
+    email) is checked against ``DUMMY_HASH`` so it takes as long."""
+    stored = passwords_db.get(user_id) if user_id is not None else None
+    if not check_password(stored or DUMMY_HASH, password) or stored is None:
+        return False
+    if needs_upgrade(stored):
+        _store_password(user_id, hash_password(password))
+    return True
+
+
+async def verify_password_async(user_id: Optional[str], password: str) -> bool:
+    """``verify_password`` with the KDF work done on the hashing pool."""
+    stored = passwords_db.get(user_id) if user_id is not None else None
+    if not await hashing_pool.run(check_password, stored or DUMMY_HASH, password) or stored is None:
+        return False
+    if needs_upgrade(stored):
+        _store_password(user_id, await hashing_pool.run(hash_password, password))
+    return True
+
+
+def _track_session(session_token: str, session: Dict) -> None:
+    user_sessions.setdefault(session["user_id"], {})[session_token] = None
+    heapq.heappush(session_expiry, (session["expires_at"], session_token))
+
+
+def _drop_session(session_token: str) -> bool:
+    principal_cache.pop(session_token)
+    session = sessions_db.pop(session_token, None)
+    if session is None:
+        return False
+    tokens = user_sessions.get(session["user_id"])
+    if tokens is not None:
+        tokens.pop(session_token, None)
+        if not tokens:
+            del user_sessions[session["user_id"]]
+    persistence.record("sessions", session_token, None)
+    return True
 
 
 def create_session(user_id: str) -> tuple[str, datetime]:
-    session_token = generate_session_token()
     expires_at = datetime.now() + timedelta(hours=24)
+    if TOKEN_MODE == "signed":
+        user = read_user(user_id)
+        return token_signer.issue(user_id, user.role.value, expires_at.timestamp()), expires_at
+    
+    session_token = generate_session_token()
+    tokens = user_sessions.get(user_id, {})
+    while len(tokens) >= MAX_SESSIONS_PER_USER:
+        _drop_session(next(iter(tokens)))
     
     sessions_db[session_token] = {
         "user_id": user_id,
         "expires_at": expires_at
     }
+    _track_session(session_token, sessions_db[session_token])
+    persistence.record("sessions", session_token, sessions_db[session_token])
     
     return session_token, expires_at
 
 
+def _verify_signed(session_token: str) -> Optional[User]:
+    claims = token_signer.verify(session_token, time.time())
+    if claims is None or claims["jti"] in revoked_tokens:
+        return None
+    
+    user = read_user(claims["sub"])
+    if user is None or user.role.value != claims["role"]:
+        return None
+    return user.model_copy()
+
+
 def verify_session(session_token: str) -> Optional[User]:
+    if TOKEN_MODE == "signed":
+        return _verify_signed(session_token)
+    
+    principal = principal_cache.get(session_token)
+    if principal is not None:
+        return principal
+    
     if session_token not in sessions_db:
         return None
     
     session = sessions_db[session_token]
     
     if datetime.now() > session["expires_at"]:
-        del sessions_db[session_token]
+        _drop_session(session_token)
         return None
     
-    return read_user(session["user_id"])
+    user = read_user(session["user_id"])
+    if user is None:
+        return None
+    principal = user.model_copy()
+    principal_cache.set(session_token, principal, expires_at=session["expires_at"].timestamp())
+    return principal
 
 
 def delete_session(session_token: str) -> bool:
-    if session_token in sessions_db:
-        del sessions_db[session_token]
+    if TOKEN_MODE == "signed":
+        claims = token_signer.verify(session_token, time.time())
+        if claims is None:
+            return False
+        revoked_tokens[claims["jti"]] = claims["exp"]
+        persistence.record("revoked_tokens", claims["jti"], claims["exp"])
         return True
-    return False
\ No newline at end of file
+    return _drop_session(session_token)
+
+
+def prune_revoked_tokens(now: Optional[float] = None) -> int:
+    """Forget revocations of tokens that have expired anyway."""
+    now = now or time.time()
+    expired = [jti for jti, expires_at in revoked_tokens.items() if expires_at <= now]
+    for jti in expired:
+        del revoked_tokens[jti]
+        persistence.record("revoked_tokens", jti, None)
+    return len(expired)
+
+
+def sweep_expired_sessions(now: Optional[datetime] = None, batch: int = SESSION_SWEEP_BATCH) -> int:
+    """Evict up to ``batch`` expired sessions, earliest expiry first.
+
+    Heap entries for sessions already removed by logout or the per-user cap
+    are skipped lazily; the heap is rebuilt once they outnumber live ones.
+    """
+    now = now or datetime.now()
+    evicted = 0
+    popped = 0
+    while session_expiry and session_expiry[0][0] < now and popped < batch:
+        expires_at, session_token = heapq.heappop(session_expiry)
+        popped += 1
+        session = sessions_db.get(session_token)
+        if session is not None and session["expires_at"] == expires_at:
+            evicted += _drop_session(session_token)
+    
+    if len(session_expiry) > 2 * len(sessions_db) + SESSION_SWEEP_BATCH:
+        rebuild_session_indexes()
+    return evicted
+
+
+def rebuild_session_indexes() -> None:
+    session_expiry.clear()
+    user_sessions.clear()
+    principal_cache.clear()
+    for session_token, session in sessions_db.items():
+        user_sessions.setdefault(session["user_id"], {})[session_token] = None
+        session_expiry.append((session["expires_at"], session_token))
+    heapq.heapify(session_expiry)
+
+
+persistence.on_load(rebuild_session_indexes)
+
+
+def read_session_stats() -> Dict:
+    return {
+        "active_sessions": len(sessions_db),
+        "users_with_sessions": len(user_sessions),
+        "expiry_entries": len(session_expiry),
+        "next_expiry": session_expiry[0][0].isoformat() if session_expiry else None,
+        "max_sessions_per_user": MAX_SESSIONS_PER_USER,
+        "token_mode": TOKEN_MODE,
+        "revoked_tokens": len(revoked_tokens),
+        "principal_cache": principal_cache.stats()
+    }
\ No newline at end of file
@@ -1,10 +1,39 @@
 import uuid
-from typing import Optional, List, Dict
+import bisect
+from typing import Optional, List, Dict, Iterator, Tuple
 from datetime import datetime, date
 from modules.schema.schemas import VisitHistory
+from modules.items.pagination import take
+from modules.items.table import Table, Index
+from modules.items.records import CompactRecord
+from modules.items.repository import make_table
 
 
-visits_db: Dict[str, VisitHistory] = {}  
+class VisitRecord(CompactRecord):
+    """Stored form of a ``VisitHistory`` with clinic, doctor, date and
+    status strings interned, since a year of visits repeats few of them."""
+
+    __slots__ = ("id", "queue_id", "patient_id", "patient_name", "clinic_id", "clinic_name",
+                 "doctor_id", "doctor_name", "visit_date", "diagnosis", "treatment", "notes",
+                 "service_status")
+    schema = VisitHistory
+    interned = ("clinic_id", "clinic_name", "doctor_id", "doctor_name", "visit_date", "service_status")
+
+
+visits_db: Table[VisitRecord] = make_table("visits", VisitRecord, [
+    Index("visit_date", ordered=True),
+    Index("patient_id"),
+    Index("queue_id"),
+    Index("clinic_id"),
+])
+
+
+def _dates_between(start_date: Optional[date] = None, end_date: Optional[date] = None) -> List[str]:
+    return visits_db.index("visit_date").keys_between(
+        start_date.isoformat() if start_date else None,
+        end_date.isoformat() if end_date else None
+    )
+
 
 def create_visit(queue_id: str, 
                 patient_id: str, 
@@ -15,9 +44,9 @@ def create_visit(queue_id: str,
                 doctor_name: str,
                 diagnosis: Optional[str] = None, 
                 treatment: Optional[str] = None, 
-                notes: Optional[str] = None) -> VisitHistory:
+                notes: Optional[str] = None) -> VisitRecord:
 
-    visit = VisitHistory(
+    visit = VisitRecord(
         id=str(uuid.uuid4()),
         queue_id=queue_id,
         patient_id=patient_id,
@@ -33,51 +62,91 @@ def create_visit(queue_id: str,
         service_status="selesai"
     )
     
-    visits_db[visit.id] = visit
-    return visit
+    return visits_db.insert(visit)
 
 
-def read_visit(visit_id: str) -> Optional[VisitHistory]:
+def read_visit(visit_id: str) -> Optional[VisitRecord]:
     return visits_db.get(visit_id)
 
 
+def iter_visits(patient_id: Optional[str] = None, 
+                clinic_id: Optional[str] = None,
+                start_date: Optional[date] = None, 
+                end_date: Optional[date] = None,
+                after: Optional[Tuple[str, int]] = None) -> Iterator[VisitRecord]:
+    """Visits newest date first, in insertion order within a date; ``after``
+    is the ``cursor_of`` of the last visit already served."""
+    if patient_id:
+        candidates = list(visits_db.filter(ordered=True, patient_id=patient_id, clinic_id=clinic_id))
+        if start_date:
+            candidates = [v for v in candidates if v.visit_date >= start_date.isoformat()]
+        if end_date:
+            candidates = [v for v in candidates if v.visit_date <= end_date.isoformat()]
+        if after:
+            after_date, after_seq = after
+            candidates = [v for v in candidates if v.visit_date < after_date or (
+                v.visit_date == after_date and visits_db.seq_of(v.id) > after_seq)]
+        # stable, so each date keeps the seq order the cursor resumes in
+        candidates.sort(key=lambda x: x.visit_date, reverse=True)
+        return iter(candidates)
+    return iter_visits_by_date(start_date, end_date, after, clinic_id)
+
+
 def read_all_visits(patient_id: Optional[str] = None, 
                    clinic_id: Optional[str] = None,
                    start_date: Optional[date] = None, 
-                   end_date: Optional[date] = None) -> List[VisitHistory]:
-    visits = list(visits_db.values())
-    
-    if patient_id:
-        visits = [v for v in visits if v.patient_id == patient_id]
-    if clinic_id:
-        visits = [v for v in visits if v.clinic_id == clinic_id]
-    if start_date:
-        visits = [v for v in visits if v.visit_date >= start_date.isoformat()]
-    if end_date:
-        visits = [v for v in visits if v.visit_date <= end_date.isoformat()]
-    
-    visits.sort(key=lambda x: x.visit_date, reverse=True)
-    return visits
+                   end_date: Optional[date] = None,
+                   limit: Optional[int] = None,
+                   after: Optional[Tuple[str, int]] = None) -> List[VisitRecord]:
+    return take(iter_visits(patient_id, clinic_id, start_date, end_date, after), limit)
 
 
-def update_visit(visit_id: str, **kwargs) -> Optional[VisitHistory]:
-    visit = visits_db.get(visit_id)
-    if not visit:
-        return None
-    
-    for key, value in kwargs.items():
-        if hasattr(visit, key) and value is not None:
-            setattr(visit, key, value)
-    
-    return visit
+def cursor_of(visit: VisitRecord) -> Tuple[str, int]:
+    return (visit.visit_date, visits_db.seq_of(visit.id))
+
+
+def count_visits(patient_id: Optional[str] = None, 
+                 clinic_id: Optional[str] = None,
+                 start_date: Optional[date] = None, 
+                 end_date: Optional[date] = None) -> int:
+    if patient_id and not (clinic_id or start_date or end_date):
+        return visits_db.count(patient_id=patient_id)
+    if not (patient_id or clinic_id):
+        return sum(count_visits_by_date(start_date, end_date).values())
+    if clinic_id and not (patient_id or start_date or end_date):
+        return visits_db.count(clinic_id=clinic_id)
+    return sum(1 for _ in iter_visits(patient_id, clinic_id, start_date, end_date))
+
+
+def iter_visits_by_date(start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        after: Optional[Tuple[str, int]] = None,
+                        clinic_id: Optional[str] = None) -> Iterator[VisitRecord]:
+    """Visits date by date, newest first; with ``clinic_id`` each date is
+    walked through whichever of the date and clinic buckets is smaller."""
+    dates = _dates_between(start_date, end_date)
+    if after:
+        after_date, after_seq = after
+        dates = dates[:bisect.bisect_right(dates, after_date)]
+    for visit_date in reversed(dates):
+        resume = after_seq if after and visit_date == after_date else None
+        yield from visits_db.filter(ordered=True, visit_date=visit_date, clinic_id=clinic_id, after=resume)
+
+
+def count_visits_by_date(start_date: Optional[date] = None,
+                         end_date: Optional[date] = None) -> Dict[str, int]:
+    index = visits_db.index("visit_date")
+    return {visit_date: len(index.get(visit_date))
+            for visit_date in _dates_between(start_date, end_date)}
+
+
+def update_visit(visit_id: str, **kwargs) -> Optional[VisitRecord]:
+    return visits_db.update(visit_id, **kwargs)
 
 
 def delete_visit(visit_id: str) -> bool:
-    if visit_id in visits_db:
-        del visits_db[visit_id]
-        return True
-    return False
+    return visits_db.delete(visit_id) is not None
 
 
-def get_visits_by_queue(queue_id: str) -> Optional[VisitHistory]:
-    return next((v for v in visits_db.values() if v.queue_id == queue_id), None)
\ No newline at end of file
+def get_visits_by_queue(queue_id: str) -> Optional[VisitRecord]:
+    return visits_db.first("queue_id", queue_id)
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends, Header
 from typing import Optional
 from modules.schema.schemas import RegisterRequest, LoginRequest, User, UserRole
 from modules.items import users as user_crud
+from modules.items.passwords import hashing_pool, hash_password, HashingBusy
 
 router = APIRouter()
 
@@ -27,16 +28,22 @@ async def require_doctor_or_admin(current_user: User = Depends(get_current_user)
 
 @router.post("/register", status_code=201)
 async def register(req: RegisterRequest):
+    if user_crud.read_user_by_email(req.email):
+        raise HTTPException(status_code=400, detail="Email sudah terdaftar")
 
     try:
+        password_hash = await hashing_pool.run(hash_password, req.password)
         user = user_crud.create_user(
             name=req.name,
             email=req.email,
-            password=req.password,
+            password=None,
             phone=req.phone,
-            role=req.role
+            role=req.role,
+            password_hash=password_hash
         )
         return {"message": "Registrasi berhasil", "user": user}
+    except HashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -44,7 +51,11 @@ async def register(req: RegisterRequest):
 @router.post("/login")
 async def login(req: LoginRequest):
     user = user_crud.read_user_by_email(req.email)
-    if not user or not user_crud.verify_password(user.id, req.password):
+    try:
+        verified = await user_crud.verify_password_async(user.id if user else None, req.password)
+    except HashingBusy as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    if not verified:
         raise HTTPException(status_code=401, detail="Email atau password salah")
     
     session_token, expires_at = user_crud.create_session(user.id)
@@ -66,4 +77,9 @@ async def logout(current_user: User = Depends(get_current_user),
 
 @router.get("/me")
 async def get_me(current_user: User = Depends(get_current_user)):
-    return {"user": current_user}
\ No newline at end of file
+    return {"user": current_user}
+
+
+@router.get("/sessions/stats")
+async def get_session_stats(current_user: User = Depends(require_admin)):
+    return user_crud.read_session_stats()
\ No newline at end of file
@@ -0,0 +1,145 @@
+import json
+import secrets
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Union
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from modules.items.cache import LRUCache
+from modules.items.records import CompactRecord
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BOOT_ID = secrets.token_hex(4)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def dump_record(row: Union[BaseModel, CompactRecord]) -> bytes:
+    if isinstance(row, CompactRecord):
+        return dumps(row.to_dict())
+    if orjson is not None:
+        return orjson.dumps(row.model_dump())
+    return dumps(row.model_dump(mode="json"))
+
+
+def make_etag(*parts) -> str:
+    """Strong ETag from version parts, scoped to this process so versions
+    counted by another worker or before a restart never collide."""
+    return '"' + "-".join([BOOT_ID, *map(str, parts)]) + '"'
+
+
+def serialize(content: Any) -> bytes:
+    return dumps(jsonable_encoder(content))
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (tag.strip() for tag in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+def cached_json(request: Request, body: bytes, etag: str, cache_control: str) -> Response:
+    if etag_matches(request, etag):
+        return not_modified(etag, cache_control)
+    return Response(body, media_type="application/json",
+                    headers={"ETag": etag, "Cache-Control": cache_control})
+
+
+class VersionedBytes:
+    """Serialized body kept until ``version`` moves past the one it was built at."""
+
+    def __init__(self):
+        self.version = 0
+        self.built_at: Optional[int] = None
+        self.body = b""
+
+    def bump(self) -> None:
+        self.version += 1
+
+    def fresh(self) -> bool:
+        return self.built_at == self.version
+
+    def store(self, body: bytes, version: int) -> bytes:
+        self.body = body
+        self.built_at = version
+        return body
+
+
+class CatalogCache:
+    """Conditional GET and serialized list bodies for one rarely changing table.
+
+    Every insert, update or delete on the table bumps ``version``, which is
+    the ETag and drops all cached bodies, so a matching ``If-None-Match`` is
+    answered before any store access and other requests reuse the body built
+    for the same query.
+    """
+
+    def __init__(self, name: str, table, cache_control: str, maxsize: int = 256):
+        self.name = name
+        self.cache_control = cache_control
+        self.version = 0
+        self.bodies = LRUCache(maxsize=maxsize, ttl=float("inf"))
+        table.listeners.append(lambda row_id, row: self.clear())
+
+    def clear(self) -> None:
+        self.version += 1
+        self.bodies.clear()
+
+    def respond(self, request: Request, key: Hashable, build: Callable[[], Any]) -> Response:
+        etag = make_etag(self.name, self.version)
+        if etag_matches(request, etag):
+            return not_modified(etag, self.cache_control)
+
+        body = self.bodies.get(key)
+        if body is None:
+            version = self.version
+            body = serialize(build())
+            if version == self.version:
+                self.bodies.set(key, body)
+        return Response(body, media_type="application/json",
+                        headers={"ETag": etag, "Cache-Control": self.cache_control})
+
+
+class FragmentCache:
+    """Serialized JSON of individual records, keyed by id.
+
+    Any insert, update or delete the table reports drops that record's
+    fragment, so list responses can be assembled by joining cached bytes and
+    only changed records are encoded again.
+    """
+
+    def __init__(self, table, maxsize: int = 100_000):
+        self.fragments = LRUCache(maxsize=maxsize, ttl=float("inf"))
+        table.listeners.append(lambda row_id, row: self.fragments.pop(row_id))
+
+    def clear(self) -> None:
+        self.fragments.clear()
+
+    def fragment(self, row: Union[BaseModel, CompactRecord]) -> bytes:
+        fragment = self.fragments.get(row.id)
+        if fragment is None:
+            fragment = dump_record(row)
+            self.fragments.set(row.id, fragment)
+        return fragment
+
+    def array(self, rows: Iterable[Union[BaseModel, CompactRecord]]) -> bytes:
+        return b"[" + b",".join(self.fragment(row) for row in rows) + b"]"
+
+    def respond(self, result: Dict[str, Any], key: str) -> Response:
+        """JSON response for ``result`` with ``result[key]`` built from fragments."""
+        rest = dumps(jsonable_encoder({k: v for k, v in result.items() if k != key}))
+        body = b'{"' + key.encode() + b'":' + self.array(result[key])
+        body += b"," + rest[1:] if len(rest) > 2 else b"}"
+        return Response(body, media_type="application/json")
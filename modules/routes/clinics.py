@@ -1,11 +1,50 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import Optional
-from modules.schema.schemas import ClinicCreate, ClinicUpdate, User
+import os
+from datetime import datetime
+from itertools import islice
+from fastapi import APIRouter, HTTPException, Depends, Request
+from typing import Optional, Dict
+from modules.schema.schemas import ClinicCreate, ClinicUpdate, Clinic, QueueStatus, User
 from modules.items import clinics as clinic_crud
+from modules.items import queues as queue_crud
 from modules.routes.auth import get_current_user, require_admin
+from modules.routes.pagination import PageParams
+from modules.routes.caching import VersionedBytes, CatalogCache, make_etag, cached_json, serialize
 
 router = APIRouter()
 
+BOARD_SIZE = int(os.getenv("HOSPITAL_BOARD_SIZE", "10"))
+BOARD_CACHE_CONTROL = "no-cache"
+boards: Dict[str, VersionedBytes] = {}
+catalog = CatalogCache(
+    "clinics", clinic_crud.clinics_db,
+    cache_control=f"public, max-age={os.getenv('HOSPITAL_CATALOG_MAX_AGE', '60')}"
+)
+
+
+def _invalidate_board(clinic_id: str) -> None:
+    board = boards.get(clinic_id)
+    if board is not None:
+        board.bump()
+
+
+queue_crud.queue_listeners.append(lambda queue: _invalidate_board(queue.clinic_id))
+clinic_crud.clinics_db.listeners.append(lambda clinic_id, clinic: _invalidate_board(clinic_id))
+
+
+def build_board(clinic: Clinic) -> dict:
+    waiting = queue_crud.iter_queues(clinic.id, QueueStatus.WAITING)
+    return {
+        "clinic_id": clinic.id,
+        "clinic_name": clinic.name,
+        "now_serving": [
+            {"queue_number": queue.queue_number, "doctor_name": queue.doctor_name}
+            for queue in queue_crud.read_now_serving(clinic.id)
+        ],
+        "next": [queue.queue_number for queue in islice(waiting, BOARD_SIZE)],
+        "total_waiting": queue_crud.get_waiting_count(clinic.id),
+        "updated_at": datetime.now().isoformat()
+    }
+
 
 @router.post("", status_code=201)
 async def create_clinic(data: ClinicCreate, current_user: User = Depends(require_admin)):
@@ -20,9 +59,13 @@ async def create_clinic(data: ClinicCreate, current_user: User = Depends(require
 
 
 @router.get("")
-async def get_all_clinics(is_active: Optional[bool] = None):
-    clinics = clinic_crud.read_all_clinics(is_active=is_active)
-    return {"clinics": clinics, "total": len(clinics)}
+async def get_all_clinics(request: Request, is_active: Optional[bool] = None, page: PageParams = Depends()):
+    def build():
+        clinics = clinic_crud.read_all_clinics(is_active=is_active, limit=page.fetch, after=page.after)
+        return page.respond("clinics", clinics, lambda: clinic_crud.count_clinics(is_active),
+                            clinic_crud.cursor_of)
+    
+    return catalog.respond(request, (is_active, page.limit, page.after, page.include_total), build)
 
 
 @router.get("/{clinic_id}")
@@ -33,6 +76,20 @@ async def get_clinic(clinic_id: str):
     return {"clinic": clinic}
 
 
+@router.get("/{clinic_id}/board")
+async def get_clinic_board(clinic_id: str, request: Request):
+    board = boards.get(clinic_id)
+    if board is None or not board.fresh():
+        clinic = clinic_crud.read_clinic(clinic_id)
+        if not clinic:
+            boards.pop(clinic_id, None)
+            raise HTTPException(status_code=404, detail="Klinik tidak ditemukan")
+        board = boards.setdefault(clinic_id, VersionedBytes())
+        version = board.version
+        board.store(serialize(build_board(clinic)), version)
+    return cached_json(request, board.body, make_etag(clinic_id, board.built_at), BOARD_CACHE_CONTROL)
+
+
 @router.put("/{clinic_id}")
 async def update_clinic(clinic_id: str, data: ClinicUpdate, 
                        current_user: User = Depends(require_admin)):
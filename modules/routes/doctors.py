@@ -1,11 +1,19 @@
-from fastapi import APIRouter, HTTPException, Depends
+import os
+from fastapi import APIRouter, HTTPException, Depends, Request
 from typing import Optional
 from modules.schema.schemas import DoctorCreate, DoctorUpdate, User
 from modules.items import doctors as doctor_crud
 from modules.routes.auth import get_current_user, require_admin
+from modules.routes.pagination import PageParams
+from modules.routes.caching import CatalogCache
 
 router = APIRouter()
 
+catalog = CatalogCache(
+    "doctors", doctor_crud.doctors_db,
+    cache_control=f"public, max-age={os.getenv('HOSPITAL_CATALOG_MAX_AGE', '60')}"
+)
+
 
 @router.post("", status_code=201)
 async def create_doctor(data: DoctorCreate, current_user: User = Depends(require_admin)):
@@ -22,10 +30,19 @@ async def create_doctor(data: DoctorCreate, current_user: User = Depends(require
 
 
 @router.get("")
-async def get_all_doctors(clinic_id: Optional[str] = None, 
-                         is_available: Optional[bool] = None):
-    doctors = doctor_crud.read_all_doctors(clinic_id=clinic_id, is_available=is_available)
-    return {"doctors": doctors, "total": len(doctors)}
+async def get_all_doctors(request: Request,
+                         clinic_id: Optional[str] = None, 
+                         is_available: Optional[bool] = None,
+                         page: PageParams = Depends()):
+    def build():
+        doctors = doctor_crud.read_all_doctors(clinic_id=clinic_id, is_available=is_available,
+                                               limit=page.fetch, after=page.after)
+        return page.respond("doctors", doctors,
+                            lambda: doctor_crud.count_doctors(clinic_id, is_available),
+                            doctor_crud.cursor_of)
+    
+    key = (clinic_id, is_available, page.limit, page.after, page.include_total)
+    return catalog.respond(request, key, build)
 
 
 @router.get("/{doctor_id}")
@@ -0,0 +1,153 @@
+import os
+import asyncio
+from typing import Any, Dict, Optional, Set
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status
+from modules.schema.schemas import UserRole
+from modules.items import queues as queue_crud
+from modules.items import clinics as clinic_crud
+from modules.items import users as user_crud
+
+router = APIRouter()
+
+
+def clinic_update(clinic_id: str) -> Dict[str, Any]:
+    return {
+        "type": "clinic",
+        "clinic_id": clinic_id,
+        "total_waiting": queue_crud.get_waiting_count(clinic_id),
+        "now_serving": [queue.queue_number for queue in queue_crud.read_now_serving(clinic_id)]
+    }
+
+
+def patient_update(patient_id: str) -> Dict[str, Any]:
+    """Position of the patient's waiting queue, or ``state`` "called" once
+    it is in service; ``now_serving`` is the board of that queue's clinic."""
+    state, queue = "waiting", queue_crud.read_waiting_queue(patient_id)
+    if not queue:
+        state, queue = "called", queue_crud.read_serving_queue(patient_id)
+    if not queue:
+        return {"type": "position", "state": None, "queue": None, "position": None,
+                "total_waiting": None, "now_serving": None}
+    return {
+        "type": "position",
+        "state": state,
+        "queue": queue.to_dict(),
+        "position": queue_crud.get_queue_position(queue.id) if state == "waiting" else None,
+        "total_waiting": queue_crud.get_waiting_count(queue.clinic_id),
+        "now_serving": [q.queue_number for q in queue_crud.read_now_serving(queue.clinic_id)]
+    }
+
+
+class QueueNotifier:
+    """Pushes queue changes to clinic and patient subscribers once per tick.
+
+    Queue listeners only mark the clinic and patient as dirty; the first
+    change in a tick schedules a flush, so a burst of changes to one clinic
+    costs one snapshot and one message per subscriber. Nothing is tracked
+    while nobody is subscribed; changes made off the event loop are handed
+    to the loop the subscribers live on.
+    """
+
+    def __init__(self, tick: float = 0.25):
+        self.tick = tick
+        self.clinic_subscribers: Dict[str, Set[WebSocket]] = {}
+        self.patient_subscribers: Dict[str, Set[WebSocket]] = {}
+        self.patient_clinics: Dict[str, Optional[str]] = {}
+        self._dirty_clinics: Set[str] = set()
+        self._dirty_patients: Set[str] = set()
+        self._scheduled = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def queue_changed(self, queue: queue_crud.QueueRecord) -> None:
+        if not self.clinic_subscribers and not self.patient_subscribers:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not self._loop:
+            self._loop.call_soon_threadsafe(self.queue_changed, queue)
+            return
+        self._dirty_clinics.add(queue.clinic_id)
+        self._dirty_patients.add(queue.patient_id)
+        if not self._scheduled:
+            self._scheduled = True
+            self._loop.call_later(self.tick, lambda: asyncio.ensure_future(self.flush()))
+
+    async def flush(self) -> None:
+        self._scheduled = False
+        clinics, self._dirty_clinics = self._dirty_clinics, set()
+        patients, self._dirty_patients = self._dirty_patients, set()
+
+        for clinic_id in clinics:
+            if clinic_id in self.clinic_subscribers:
+                await self._send(self.clinic_subscribers, clinic_id, clinic_update(clinic_id))
+
+        patients.update(p for p, c in self.patient_clinics.items() if c in clinics)
+        for patient_id in patients:
+            if patient_id in self.patient_subscribers:
+                update = patient_update(patient_id)
+                self.patient_clinics[patient_id] = update["queue"]["clinic_id"] if update["queue"] else None
+                await self._send(self.patient_subscribers, patient_id, update)
+
+    async def _send(self, subscribers: Dict[str, Set[WebSocket]], key: str, message: Dict[str, Any]) -> None:
+        for websocket in list(subscribers.get(key, ())):
+            try:
+                await websocket.send_json(message)
+            except Exception:
+                self.unsubscribe(subscribers, key, websocket)
+
+    def subscribe(self, subscribers: Dict[str, Set[WebSocket]], key: str, websocket: WebSocket) -> None:
+        self._loop = asyncio.get_running_loop()
+        subscribers.setdefault(key, set()).add(websocket)
+
+    def unsubscribe(self, subscribers: Dict[str, Set[WebSocket]], key: str, websocket: WebSocket) -> None:
+        sockets = subscribers.get(key)
+        if sockets is None:
+            return
+        sockets.discard(websocket)
+        if not sockets:
+            del subscribers[key]
+            if subscribers is self.patient_subscribers:
+                self.patient_clinics.pop(key, None)
+
+
+notifier = QueueNotifier(tick=float(os.getenv("HOSPITAL_PUSH_TICK_MS", "250")) / 1000)
+queue_crud.queue_listeners.append(notifier.queue_changed)
+
+
+async def _listen(websocket: WebSocket, subscribers: Dict[str, Set[WebSocket]], key: str) -> None:
+    notifier.subscribe(subscribers, key, websocket)
+    try:
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        notifier.unsubscribe(subscribers, key, websocket)
+
+
+@router.websocket("/clinics/{clinic_id}")
+async def clinic_channel(websocket: WebSocket, clinic_id: str):
+    if not clinic_crud.read_clinic(clinic_id):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await websocket.send_json(clinic_update(clinic_id))
+    await _listen(websocket, notifier.clinic_subscribers, clinic_id)
+
+
+@router.websocket("/me")
+async def patient_channel(websocket: WebSocket, token: Optional[str] = None):
+    session_token = token or websocket.headers.get("x-session-token")
+    user = user_crud.verify_session(session_token) if session_token else None
+    if not user or user.role != UserRole.PATIENT:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    update = patient_update(user.id)
+    notifier.patient_clinics[user.id] = update["queue"]["clinic_id"] if update["queue"] else None
+    await websocket.send_json(update)
+    await _listen(websocket, notifier.patient_subscribers, user.id)
@@ -0,0 +1,70 @@
+import json
+import base64
+import binascii
+from typing import Any, Callable, List, Optional, Tuple
+from fastapi import HTTPException, Query
+
+
+def encode_cursor(key: Tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key), separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Cursor tidak valid")
+    if not isinstance(key, list):
+        raise ValueError("Cursor tidak valid")
+    return tuple(key)
+
+
+class PageParams:
+    """Limit and cursor of a listing in table order.
+
+    The cursor carries the sort key of the last row served (its table
+    ``seq``), not its id, so the next page seeks straight past that position
+    and still continues when the row was deleted or left the filter.
+    """
+
+    cursor_types: Tuple[type, ...] = (int,)
+
+    def __init__(self,
+                 limit: Optional[int] = Query(None, ge=1, le=1000),
+                 after: Optional[str] = None,
+                 include_total: bool = False):
+        self.limit = limit
+        self.include_total = include_total
+        try:
+            self.after = decode_cursor(after) if after else None
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if self.after is not None and not self._valid(self.after):
+            raise HTTPException(status_code=400, detail="Cursor tidak valid")
+
+    def _valid(self, key: Tuple) -> bool:
+        return len(key) == len(self.cursor_types) and all(
+            isinstance(value, kind) and not isinstance(value, bool)
+            for value, kind in zip(key, self.cursor_types)
+        )
+
+    @property
+    def fetch(self) -> Optional[int]:
+        return self.limit + 1 if self.limit else None
+
+    def respond(self, key: str, rows: List, count: Callable[[], int],
+                cursor_of: Callable[[Any], Tuple]) -> dict:
+        if self.limit is None:
+            return {key: rows, "total": len(rows)}
+        
+        next_cursor = encode_cursor(cursor_of(rows[self.limit - 1])) if len(rows) > self.limit else None
+        result = {key: rows[:self.limit], "next_cursor": next_cursor}
+        if self.include_total:
+            result["total"] = count()
+        return result
+
+
+class DatedPageParams(PageParams):
+    """Cursor for listings newest date first: ``(date, seq)``."""
+
+    cursor_types = (str, int)
@@ -3,10 +3,15 @@ from typing import Optional
 from modules.schema.schemas import QueueRegisterRequest, QueueStatus, User, UserRole
 from modules.items import queues as queue_crud
 from modules.items import visits as visit_crud
+from modules.items import clinics as clinic_crud
 from modules.routes.auth import get_current_user, require_doctor_or_admin
+from modules.routes.pagination import PageParams
+from modules.routes.caching import FragmentCache
 
 router = APIRouter()
 
+fragments = FragmentCache(queue_crud.queues_db)
+
 
 @router.post("/register", status_code=201)
 async def register_queue(data: QueueRegisterRequest, 
@@ -26,7 +31,7 @@ async def register_queue(data: QueueRegisterRequest,
         
         return {
             "message": "Pendaftaran antrean berhasil",
-            "queue": queue,
+            "queue": queue.to_schema(),
             "position": position
         }
     except ValueError as e:
@@ -36,13 +41,17 @@ async def register_queue(data: QueueRegisterRequest,
 @router.get("")
 async def get_all_queues(clinic_id: Optional[str] = None,
                         status: Optional[QueueStatus] = None,
+                        page: PageParams = Depends(),
                         current_user: User = Depends(get_current_user)):
     if current_user.role == UserRole.PATIENT:
-        queues = queue_crud.read_all_queues(patient_id=current_user.id, status=status)
+        filters = {"patient_id": current_user.id, "status": status}
     else:
-        queues = queue_crud.read_all_queues(clinic_id=clinic_id, status=status)
+        filters = {"clinic_id": clinic_id, "status": status}
     
-    return {"queues": queues, "total": len(queues)}
+    queues = queue_crud.read_all_queues(**filters, limit=page.fetch, after=page.after)
+    result = page.respond("queues", queues, lambda: queue_crud.count_queues(**filters),
+                          queue_crud.cursor_of)
+    return fragments.respond(result, "queues")
 
 
 @router.get("/my-position")
@@ -50,26 +59,16 @@ async def get_my_position(current_user: User = Depends(get_current_user)):
     if current_user.role != UserRole.PATIENT:
         raise HTTPException(status_code=403, detail="Endpoint ini hanya untuk pasien")
     
-    user_queues = queue_crud.read_all_queues(
-        patient_id=current_user.id,
-        status=QueueStatus.WAITING
-    )
-    
-    if not user_queues:
+    queue = queue_crud.read_waiting_queue(current_user.id)
+    if not queue:
         return {"message": "Tidak ada antrean aktif", "position": None}
     
-    queue = user_queues[0]
     position = queue_crud.get_queue_position(queue.id)
     
-    all_waiting = queue_crud.read_all_queues(
-        clinic_id=queue.clinic_id,
-        status=QueueStatus.WAITING
-    )
-    
     return {
-        "queue": queue,
+        "queue": queue.to_schema(),
         "position": position,
-        "total_waiting": len(all_waiting),
+        "total_waiting": queue_crud.get_waiting_count(queue.clinic_id),
         "estimated_wait_minutes": position * 15
     }
 
@@ -83,7 +82,7 @@ async def get_queue(queue_id: str, current_user: User = Depends(get_current_user
     if current_user.role == UserRole.PATIENT and queue.patient_id != current_user.id:
         raise HTTPException(status_code=403, detail="Tidak memiliki akses ke antrean ini")
     
-    return {"queue": queue}
+    return {"queue": queue.to_schema()}
 
 
 @router.patch("/{queue_id}/call")
@@ -96,7 +95,25 @@ async def call_queue(queue_id: str, current_user: User = Depends(require_doctor_
         raise HTTPException(status_code=400, detail="Antrean tidak dalam status menunggu")
     
     updated_queue = queue_crud.update_queue_status(queue_id, QueueStatus.IN_SERVICE)
-    return {"message": "Pasien berhasil dipanggil", "queue": updated_queue}
+    return {"message": "Pasien berhasil dipanggil", "queue": updated_queue.to_schema()}
+
+
+@router.post("/clinics/{clinic_id}/call-next")
+async def call_next_queue(clinic_id: str,
+                         doctor_id: Optional[str] = None,
+                         current_user: User = Depends(require_doctor_or_admin)):
+    if not clinic_crud.read_clinic(clinic_id):
+        raise HTTPException(status_code=404, detail="Klinik tidak ditemukan")
+    
+    try:
+        queue = queue_crud.call_next_queue(clinic_id, doctor_id=doctor_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if not queue:
+        raise HTTPException(status_code=404, detail="Tidak ada antrean menunggu")
+    
+    return {"message": "Pasien berhasil dipanggil", "queue": queue.to_schema()}
 
 
 @router.patch("/{queue_id}/complete")
@@ -133,8 +150,8 @@ async def complete_queue(queue_id: str,
     
     return {
         "message": "Pelayanan berhasil diselesaikan",
-        "queue": updated_queue,
-        "visit_history": visit
+        "queue": updated_queue.to_schema(),
+        "visit_history": visit.to_schema()
     }
 
 
@@ -151,4 +168,4 @@ async def cancel_queue(queue_id: str, current_user: User = Depends(get_current_u
         raise HTTPException(status_code=400, detail="Hanya antrean menunggu yang dapat dibatalkan")
     
     updated_queue = queue_crud.update_queue_status(queue_id, QueueStatus.CANCELLED)
-    return {"message": "Antrean berhasil dibatalkan", "queue": updated_queue}
\ No newline at end of file
+    return {"message": "Antrean berhasil dibatalkan", "queue": updated_queue.to_schema()}
\ No newline at end of file
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, HTTPException, Depends
+import heapq
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import Optional
-from datetime import datetime, date
-from modules.schema.schemas import User, QueueStatus
-from modules.items.queues import queues_db
+from datetime import date, timedelta
+from modules.schema.schemas import User, DurationMetric, DurationGroup
+from modules.items import queues as queue_crud
 from modules.items.clinics import clinics_db
-from modules.items.visits import visits_db
+from modules.items.doctors import doctors_db
+from modules.items import visits as visit_crud
+from modules.items.analytics import service_columns
+from modules.items.records import to_epoch, from_epoch, epoch_now
+from modules.items.sketches import wait_times, DDSketch, HOUR, WINDOW_HOURS, RELATIVE_ACCURACY
 from modules.routes.auth import require_doctor_or_admin
 
 router = APIRouter()
@@ -13,73 +18,60 @@ router = APIRouter()
 @router.get("/queue-summary")
 async def get_queue_summary(clinic_id: Optional[str] = None,
                            current_user: User = Depends(require_doctor_or_admin)):
-    queues = list(queues_db.values())
-    
-    if clinic_id:
-        queues = [q for q in queues if q.clinic_id == clinic_id]
-    
-    total = len(queues)
-    waiting = len([q for q in queues if q.status == QueueStatus.WAITING])
-    in_service = len([q for q in queues if q.status == QueueStatus.IN_SERVICE])
-    completed = len([q for q in queues if q.status == QueueStatus.COMPLETED])
-    cancelled = len([q for q in queues if q.status == QueueStatus.CANCELLED])
-    
-    completed_queues = [q for q in queues if q.status == QueueStatus.COMPLETED 
-                       and q.service_start_time and q.service_end_time]
+    stats = queue_crud.read_queue_stats(clinic_id)
     
     avg_service_time = 0
-    if completed_queues:
-        service_times = []
-        for q in completed_queues:
-            start = datetime.fromisoformat(q.service_start_time)
-            end = datetime.fromisoformat(q.service_end_time)
-            service_times.append((end - start).total_seconds() / 60)
-        avg_service_time = sum(service_times) / len(service_times)
+    if stats["service_count"]:
+        avg_service_time = stats["service_seconds"] / stats["service_count"] / 60
     
     return {
-        "total_queues": total,
-        "waiting": waiting,
-        "in_service": in_service,
-        "completed": completed,
-        "cancelled": cancelled,
+        "total_queues": stats["total"],
+        "waiting": stats["waiting"],
+        "in_service": stats["in_service"],
+        "completed": stats["completed"],
+        "cancelled": stats["cancelled"],
         "average_service_time_minutes": round(avg_service_time, 2)
     }
 
 
 @router.get("/clinic-density")
-async def get_clinic_density(current_user: User = Depends(require_doctor_or_admin)):
-    clinics = list(clinics_db.values())
+async def get_clinic_density(top_n: Optional[int] = Query(None, ge=1),
+                            current_user: User = Depends(require_doctor_or_admin)):
     density_data = []
-    
-    for clinic in clinics:
-        queues = [q for q in queues_db.values() if q.clinic_id == clinic.id]
-        waiting = len([q for q in queues if q.status == QueueStatus.WAITING])
-        in_service = len([q for q in queues if q.status == QueueStatus.IN_SERVICE])
-        
+    for clinic in clinics_db.values():
+        stats = queue_crud.read_queue_stats(clinic.id)
         density_data.append({
             "clinic_id": clinic.id,
             "clinic_name": clinic.name,
-            "total_queues": len(queues),
-            "waiting": waiting,
-            "in_service": in_service,
-            "active_patients": waiting + in_service
+            "total_queues": stats["total"],
+            "waiting": stats["waiting"],
+            "in_service": stats["in_service"],
+            "active_patients": stats["waiting"] + stats["in_service"]
         })
     
-    density_data.sort(key=lambda x: x["active_patients"], reverse=True)
+    if top_n:
+        density_data = heapq.nlargest(top_n, density_data, key=lambda x: x["active_patients"])
+    else:
+        density_data.sort(key=lambda x: x["active_patients"], reverse=True)
     
     return {"clinic_density": density_data}
 
 
 @router.get("/daily-visits")
 async def get_daily_visits(visit_date: Optional[date] = None,
+                          start_date: Optional[date] = None,
+                          end_date: Optional[date] = None,
                           current_user: User = Depends(require_doctor_or_admin)):
-    target_date = visit_date or date.today()
-    
-    visits = [v for v in visits_db.values() 
-             if v.visit_date == target_date.isoformat()]
+    if start_date or end_date:
+        end_date = end_date or date.today()
+        start_date = start_date or end_date
+        if start_date > end_date:
+            raise HTTPException(status_code=400, detail="start_date tidak boleh setelah end_date")
+    else:
+        start_date = end_date = visit_date or date.today()
     
     clinic_visits = {}
-    for visit in visits:
+    for visit in visit_crud.iter_visits_by_date(start_date, end_date):
         if visit.clinic_id not in clinic_visits:
             clinic_visits[visit.clinic_id] = {
                 "clinic_id": visit.clinic_id,
@@ -88,8 +80,132 @@ async def get_daily_visits(visit_date: Optional[date] = None,
             }
         clinic_visits[visit.clinic_id]["total_visits"] += 1
     
-    return {
-        "date": target_date.isoformat(),
-        "total_visits": len(visits),
+    daily_totals = visit_crud.count_visits_by_date(start_date, end_date)
+    
+    result = {
+        "total_visits": sum(daily_totals.values()),
         "clinic_breakdown": list(clinic_visits.values())
-    }
\ No newline at end of file
+    }
+    if start_date == end_date:
+        result = {"date": start_date.isoformat(), **result}
+    else:
+        result = {
+            "start_date": start_date.isoformat(),
+            "end_date": end_date.isoformat(),
+            **result,
+            "daily_breakdown": [
+                {"date": day, "total_visits": total} for day, total in daily_totals.items()
+            ]
+        }
+    return result
+
+
+MAX_HISTOGRAM_BINS = 1000
+
+
+def _duration_filters(clinic_id: Optional[str], doctor_id: Optional[str],
+                      start_date: Optional[date], end_date: Optional[date]) -> dict:
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date tidak boleh setelah end_date")
+    return {
+        "clinic_id": clinic_id,
+        "doctor_id": doctor_id,
+        "since": to_epoch(start_date.isoformat()) if start_date else None,
+        "until": to_epoch((end_date + timedelta(days=1)).isoformat()) if end_date else None
+    }
+
+
+def _group_label(group_by: DurationGroup, key) -> dict:
+    if group_by == DurationGroup.CLINIC:
+        clinic = clinics_db.get(key)
+        return {"clinic_id": key, "clinic_name": clinic.name if clinic else None}
+    if group_by == DurationGroup.DOCTOR:
+        doctor = doctors_db.get(key) if key else None
+        return {"doctor_id": key, "doctor_name": doctor.name if doctor else None}
+    return {"hour": int(key)}
+
+
+@router.get("/durations")
+async def get_durations(metric: DurationMetric = DurationMetric.SERVICE,
+                        group_by: Optional[DurationGroup] = None,
+                        clinic_id: Optional[str] = None,
+                        doctor_id: Optional[str] = None,
+                        start_date: Optional[date] = None,
+                        end_date: Optional[date] = None,
+                        current_user: User = Depends(require_doctor_or_admin)):
+    filters = _duration_filters(clinic_id, doctor_id, start_date, end_date)
+    
+    if group_by is None:
+        overall = service_columns.summary(metric.value, **filters)
+        return {"metric": metric, **(overall[0] if overall else {"count": 0})}
+    
+    groups = service_columns.summary(metric.value, group_by.value, **filters)
+    return {
+        "metric": metric,
+        "group_by": group_by,
+        "groups": [{**_group_label(group_by, group.pop("key")), **group} for group in groups]
+    }
+
+
+@router.get("/durations/histogram")
+async def get_duration_histogram(metric: DurationMetric = DurationMetric.SERVICE,
+                                 bin_minutes: float = Query(5, gt=0),
+                                 max_minutes: float = Query(120, gt=0),
+                                 clinic_id: Optional[str] = None,
+                                 doctor_id: Optional[str] = None,
+                                 start_date: Optional[date] = None,
+                                 end_date: Optional[date] = None,
+                                 current_user: User = Depends(require_doctor_or_admin)):
+    if max_minutes / bin_minutes > MAX_HISTOGRAM_BINS:
+        raise HTTPException(status_code=400, detail=f"Maksimal {MAX_HISTOGRAM_BINS} bin")
+    
+    filters = _duration_filters(clinic_id, doctor_id, start_date, end_date)
+    return {
+        "metric": metric,
+        "bin_minutes": bin_minutes,
+        **service_columns.histogram(metric.value, bin_minutes, max_minutes, **filters)
+    }
+
+
+def _quantiles(sketch: DDSketch) -> dict:
+    if not sketch.count:
+        return {"count": 0}
+    return {
+        "count": sketch.count,
+        "mean_minutes": round(sketch.sum / sketch.count / 60, 2),
+        **{f"p{p}_minutes": round(sketch.quantile(p / 100) / 60, 2) for p in (50, 90, 99)}
+    }
+
+
+def _wait_times(scope, hours: Optional[int]) -> dict:
+    return {metric: _quantiles(wait_times.sketch(metric, scope, hours)) for metric in wait_times.METRICS}
+
+
+@router.get("/wait-times")
+async def get_wait_times(clinic_id: Optional[str] = None,
+                         doctor_id: Optional[str] = None,
+                         hours: Optional[int] = Query(None, ge=1, le=WINDOW_HOURS),
+                         group_by: Optional[DurationGroup] = None,
+                         current_user: User = Depends(require_doctor_or_admin)):
+    if clinic_id and doctor_id:
+        raise HTTPException(status_code=400, detail="Pilih salah satu: clinic_id atau doctor_id")
+    scope = ("doctor", doctor_id) if doctor_id else ("clinic", clinic_id) if clinic_id else ("all", None)
+    result = {"hours": hours, "relative_accuracy": RELATIVE_ACCURACY}
+    
+    if group_by is None:
+        return {**result, **_wait_times(scope, hours)}
+    
+    if group_by == DurationGroup.HOUR:
+        windows = {metric: wait_times.windows(metric, scope) for metric in wait_times.METRICS}
+        since = epoch_now() // HOUR - (hours or WINDOW_HOURS)
+        groups = [
+            {"hour_start": from_epoch(hour * HOUR),
+             **{metric: _quantiles(windows[metric].get(hour, DDSketch())) for metric in windows}}
+            for hour in sorted(set().union(*windows.values())) if hour > since
+        ]
+    else:
+        if clinic_id or doctor_id:
+            raise HTTPException(status_code=400, detail="group_by clinic/doctor tidak dapat difilter")
+        groups = [{**_group_label(group_by, key), **_wait_times((group_by.value, key), hours)}
+                  for key in wait_times.scopes(group_by.value)]
+    return {**result, "group_by": group_by, "groups": groups}
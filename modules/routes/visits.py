@@ -4,33 +4,41 @@ from datetime import date
 from modules.schema.schemas import User, UserRole
 from modules.items import visits as visit_crud
 from modules.routes.auth import get_current_user
+from modules.routes.pagination import DatedPageParams
+from modules.routes.caching import FragmentCache
 
 router = APIRouter()
 
+fragments = FragmentCache(visit_crud.visits_db)
+
 
 @router.get("")
 async def get_all_visits(patient_id: Optional[str] = None,
                         clinic_id: Optional[str] = None,
                         start_date: Optional[date] = None,
                         end_date: Optional[date] = None,
+                        page: DatedPageParams = Depends(),
                         current_user: User = Depends(get_current_user)):
 
     if current_user.role == UserRole.PATIENT:
-        visits = visit_crud.read_all_visits(
-            patient_id=current_user.id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        filters = {
+            "patient_id": current_user.id,
+            "start_date": start_date,
+            "end_date": end_date
+        }
     else:
 
-        visits = visit_crud.read_all_visits(
-            patient_id=patient_id,
-            clinic_id=clinic_id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        filters = {
+            "patient_id": patient_id,
+            "clinic_id": clinic_id,
+            "start_date": start_date,
+            "end_date": end_date
+        }
     
-    return {"visit_history": visits, "total": len(visits)}
+    visits = visit_crud.read_all_visits(**filters, limit=page.fetch, after=page.after)
+    result = page.respond("visit_history", visits, lambda: visit_crud.count_visits(**filters),
+                          visit_crud.cursor_of)
+    return fragments.respond(result, "visit_history")
 
 
 @router.get("/{visit_id}")
@@ -42,4 +50,4 @@ async def get_visit(visit_id: str, current_user: User = Depends(get_current_user
     if current_user.role == UserRole.PATIENT and visit.patient_id != current_user.id:
         raise HTTPException(status_code=403, detail="Tidak memiliki akses ke riwayat kunjungan ini")
     
-    return {"visit_history": visit}
\ No newline at end of file
+    return {"visit_history": visit.to_schema()}
\ No newline at end of file
@@ -17,6 +17,18 @@ class QueueStatus(str, Enum):
     CANCELLED = "dibatalkan"
 
 
+class DurationMetric(str, Enum):
+    WAIT = "wait"
+    SERVICE = "service"
+    TOTAL = "total"
+
+
+class DurationGroup(str, Enum):
+    CLINIC = "clinic"
+    DOCTOR = "doctor"
+    HOUR = "hour"
+
+
 class User(BaseModel):
     id: str
     name: str
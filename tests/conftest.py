@@ -1,7 +1,18 @@
+import os
+
+os.environ.setdefault("HOSPITAL_SCRYPT_N", "1024")
+
 import pytest
 from fastapi.testclient import TestClient
 from main import app
-from modules.items import users, clinics, doctors, queues, visits
+from modules.items import users, clinics, doctors, queues, visits, analytics, sketches, repository
+from modules.routes import clinics as clinic_routes
+from modules.routes import doctors as doctor_routes
+from modules.routes import queues as queue_routes
+from modules.routes import visits as visit_routes
+
+if repository.using_sql():
+    repository.open_storage()
 
 @pytest.fixture
 def client():
@@ -14,22 +25,56 @@ def clear_all_data():
     users.users_db.clear()
     users.passwords_db.clear()
     users.sessions_db.clear()
+    users.session_expiry.clear()
+    users.user_sessions.clear()
+    users.principal_cache.clear()
+    users.revoked_tokens.clear()
+    users.medical_record_numbers.reset()
     clinics.clinics_db.clear()
+    clinics.clinic_ids.reset()
     doctors.doctors_db.clear()
+    doctors.doctor_ids.reset()
     queues.queues_db.clear()
     queues.queue_counters.clear()
+    queues.waiting_lines.clear()
+    queues.doctor_lines.clear()
+    queues.rebuild_queue_stats()
+    analytics.service_columns.clear()
+    sketches.wait_times.clear()
     visits.visits_db.clear()
+    clinic_routes.boards.clear()
+    clinic_routes.catalog.clear()
+    doctor_routes.catalog.clear()
+    queue_routes.fragments.clear()
+    visit_routes.fragments.clear()
     
     yield
     
     users.users_db.clear()
     users.passwords_db.clear()
     users.sessions_db.clear()
+    users.session_expiry.clear()
+    users.user_sessions.clear()
+    users.principal_cache.clear()
+    users.revoked_tokens.clear()
+    users.medical_record_numbers.reset()
     clinics.clinics_db.clear()
+    clinics.clinic_ids.reset()
     doctors.doctors_db.clear()
+    doctors.doctor_ids.reset()
     queues.queues_db.clear()
     queues.queue_counters.clear()
+    queues.waiting_lines.clear()
+    queues.doctor_lines.clear()
+    queues.rebuild_queue_stats()
+    analytics.service_columns.clear()
+    sketches.wait_times.clear()
     visits.visits_db.clear()
+    clinic_routes.boards.clear()
+    clinic_routes.catalog.clear()
+    doctor_routes.catalog.clear()
+    queue_routes.fragments.clear()
+    visit_routes.fragments.clear()
 
 
 @pytest.fixture
@@ -0,0 +1,30 @@
+from modules.schema.schemas import QueueStatus
+from modules.items.queues import QueueRecord
+from modules.items.analytics import ServiceColumns
+
+
+class TestServiceColumns:
+    
+    def completed(self, i, clinic_id, doctor_id, service_minutes):
+        start = 1_700_000_000_000_000 + i * 3_600_000_000
+        return QueueRecord(
+            id=f"q{i}", clinic_id=clinic_id, doctor_id=doctor_id, status=QueueStatus.COMPLETED,
+            registration_at=start, called_at=start, service_start_at=start,
+            service_end_at=start + service_minutes * 60_000_000
+        )
+    
+    def test_grouped_percentiles_and_removal(self):
+        columns = ServiceColumns(capacity=2)
+        for i, minutes in enumerate([10, 20, 30, 40]):
+            columns.add(self.completed(i, "c1", "d1" if i < 2 else "d2", minutes))
+        columns.add(self.completed(4, "c2", None, 5))
+        columns.queue_changed("q3", None)
+        
+        by_doctor = {g["key"]: g for g in columns.summary("service", "doctor", percentiles=(50,))}
+        
+        assert len(columns) == 4
+        assert by_doctor["d1"]["count"] == 2 and by_doctor["d1"]["p50_minutes"] == 15
+        assert by_doctor["d2"]["count"] == 1 and by_doctor["d2"]["mean_minutes"] == 30
+        assert by_doctor[None]["count"] == 1
+        assert columns.summary("service", clinic_id="c1")[0]["count"] == 3
+        assert columns.histogram("service", 10, 20)["overflow"] == 1
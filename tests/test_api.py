@@ -1,3 +1,12 @@
+import hashlib
+import pytest
+from datetime import date, datetime, timedelta
+from modules.items import visits, users, passwords, clinics, doctors, queues, repository
+from modules.routes import live
+from modules.routes import queues as queue_routes
+from modules.schema.schemas import QueueStatus, UserRole
+from modules.items.tokens import TokenSigner, signer_from_env
+
 
 class TestSystem:
     
@@ -7,6 +16,11 @@ class TestSystem:
         assert response.status_code == 200
         assert "Hospital Queue Management System API" in response.json()["message"]
     
+    def test_multiple_workers_refused(self, monkeypatch):
+        monkeypatch.setenv("WEB_CONCURRENCY", "2")
+        with pytest.raises(RuntimeError):
+            repository.open_storage()
+    
     def test_health_check(self, client):
         
         response = client.get("/health")
@@ -69,6 +83,182 @@ class TestAuthentication:
         
         assert response.status_code == 401
 
+    
+    def test_email_is_case_insensitive(self, client):
+        
+        client.post("/api/auth/register", json={
+            "name": "Test User",
+            "email": "User@Test.com",
+            "password": "password123",
+            "phone": "08123456789",
+            "role": "patient"
+        })
+        
+        duplicate = client.post("/api/auth/register", json={
+            "name": "Other User",
+            "email": "user@test.com",
+            "password": "password123",
+            "phone": "08123456789",
+            "role": "patient"
+        })
+        assert duplicate.status_code == 400
+        
+        response = client.post("/api/auth/login", json={
+            "email": "USER@test.com",
+            "password": "password123"
+        })
+        assert response.status_code == 200
+
+    def test_session_cap_evicts_oldest(self, client, monkeypatch):
+        monkeypatch.setattr(users, "MAX_SESSIONS_PER_USER", 2)
+        client.post("/api/auth/register", json={
+            "name": "Test User", "email": "user@test.com",
+            "password": "password123", "phone": "08123456789", "role": "patient"
+        })
+        tokens = [client.post("/api/auth/login", json={
+            "email": "user@test.com", "password": "password123"
+        }).json()["session_token"] for _ in range(3)]
+        
+        assert client.get("/api/auth/me", headers={"X-Session-Token": tokens[0]}).status_code == 401
+        assert client.get("/api/auth/me", headers={"X-Session-Token": tokens[2]}).status_code == 200
+        assert len(users.sessions_db) == 2
+    
+    def test_sweeper_evicts_expired_sessions(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Test User", "email": "user@test.com",
+            "password": "password123", "phone": "08123456789", "role": "patient"
+        })
+        for _ in range(2):
+            client.post("/api/auth/login", json={"email": "user@test.com", "password": "password123"})
+        
+        assert users.sweep_expired_sessions(now=datetime.now() + timedelta(hours=25)) == 2
+        assert users.user_sessions == {}
+        
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        response = client.get("/api/auth/sessions/stats", headers={"X-Session-Token": admin_token})
+        assert response.status_code == 200
+        assert response.json()["active_sessions"] == 1
+        assert response.json()["users_with_sessions"] == 1
+
+    
+    def test_principal_cache_invalidated_by_update(self, client):
+        user = users.create_user("Test User", "user@test.com", "password123", "08123456789")
+        token = client.post("/api/auth/login", json={
+            "email": "user@test.com", "password": "password123"
+        }).json()["session_token"]
+        headers = {"X-Session-Token": token}
+        
+        client.get("/api/auth/me", headers=headers)
+        client.get("/api/auth/me", headers=headers)
+        assert users.principal_cache.hits == 1
+        
+        users.update_user(user.id, name="Renamed")
+        assert client.get("/api/auth/me", headers=headers).json()["user"]["name"] == "Renamed"
+        
+        client.post("/api/auth/logout", headers=headers)
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+    
+    def test_signed_tokens_verify_without_session_store(self, client, monkeypatch):
+        monkeypatch.setattr(users, "TOKEN_MODE", "signed")
+        client.post("/api/auth/register", json={
+            "name": "Test User", "email": "user@test.com",
+            "password": "password123", "phone": "08123456789", "role": "patient"
+        })
+        token = client.post("/api/auth/login", json={
+            "email": "user@test.com", "password": "password123"
+        }).json()["session_token"]
+        headers = {"X-Session-Token": token}
+        
+        assert users.sessions_db == {}
+        assert client.get("/api/auth/me", headers=headers).status_code == 200
+        
+        key_id, body, signature = token.split(".")
+        forged = f"{key_id}.{body}.{signature[::-1]}"
+        assert client.get("/api/auth/me", headers={"X-Session-Token": forged}).status_code == 401
+        
+        client.post("/api/auth/logout", headers=headers)
+        assert client.get("/api/auth/me", headers=headers).status_code == 401
+        assert len(users.revoked_tokens) == 1
+    
+    def test_malformed_tokens_rejected(self, client, monkeypatch):
+        for mode in ["session", "signed"]:
+            monkeypatch.setattr(users, "TOKEN_MODE", mode)
+            for token in ["k0.e30.\xe9", "k0.e30.abc", "\xe9"]:
+                response = client.get("/api/auth/me", headers={"X-Session-Token": token.encode("latin-1")})
+                assert response.status_code == 401
+    
+    def test_signed_tokens_survive_key_rotation(self, client, monkeypatch):
+        monkeypatch.setattr(users, "TOKEN_MODE", "signed")
+        monkeypatch.setattr(users, "token_signer", TokenSigner({"old": b"old-secret"}, "old"))
+        user = users.create_user("Test User", "user@test.com", "password123", "08123456789")
+        old_token, _ = users.create_session(user.id)
+        
+        users.token_signer.rotate("new", b"new-secret")
+        new_token, _ = users.create_session(user.id)
+        
+        assert new_token.startswith("new.")
+        assert users.verify_session(old_token).id == user.id
+        users.token_signer.retire("old")
+        assert users.verify_session(old_token) is None
+        assert users.verify_session(new_token).id == user.id
+    
+    def test_signed_mode_requires_configured_keys(self, monkeypatch):
+        monkeypatch.delenv("HOSPITAL_TOKEN_KEYS", raising=False)
+        with pytest.raises(RuntimeError):
+            signer_from_env(required=True)
+        assert signer_from_env().active == "k0"
+        
+        monkeypatch.setenv("HOSPITAL_TOKEN_KEYS", f"a:{'1' * 32},b:{'2' * 32}")
+        assert signer_from_env(required=True).active == "a"
+        
+        for spec in [f"a:{'1' * 32},old", f"a:{'1' * 32},old:", f":{'1' * 32}", f"a:{'1' * 31}"]:
+            monkeypatch.setenv("HOSPITAL_TOKEN_KEYS", spec)
+            with pytest.raises(RuntimeError):
+                signer_from_env()
+    
+    def test_legacy_password_hash_upgraded_on_login(self, client):
+        user = users.create_user("Test User", "user@test.com", "password123", "08123456789")
+        users.passwords_db[user.id] = hashlib.sha256(b"password123").hexdigest()
+        
+        response = client.post("/api/auth/login", json={
+            "email": "user@test.com", "password": "password123"
+        })
+        
+        assert response.status_code == 200
+        assert users.passwords_db[user.id].startswith("scrypt$")
+        assert users.verify_password(user.id, "password123")
+        assert not users.verify_password(user.id, "wrongpassword")
+    
+    def test_login_rejected_when_hashing_queue_full(self, client, monkeypatch):
+        users.create_user("Test User", "user@test.com", "password123", "08123456789")
+        monkeypatch.setattr(passwords.hashing_pool, "queue_limit", 0)
+        
+        response = client.post("/api/auth/login", json={
+            "email": "user@test.com", "password": "password123"
+        })
+        
+        assert response.status_code == 503
+    
+    def test_unknown_email_still_checks_a_hash(self, client, monkeypatch):
+        checked = []
+        def check(stored, password):
+            checked.append(stored)
+            return passwords.check_password(stored, password)
+        monkeypatch.setattr(users, "check_password", check)
+        
+        response = client.post("/api/auth/login", json={
+            "email": "nobody@test.com", "password": "password123"
+        })
+        
+        assert response.status_code == 401
+        assert checked == [passwords.DUMMY_HASH]
 
 class TestClinics:
     
@@ -148,6 +338,137 @@ class TestClinics:
         assert response.status_code == 200
         assert "berhasil dihapus" in response.json()["message"]
 
+    
+    def test_clinic_ids_not_reused_after_delete(self, client):
+        
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": token},
+            json={"name": "Klinik A"}
+        )
+        second = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": token},
+            json={"name": "Klinik B"}
+        ).json()["clinic"]
+        client.delete(
+            f"/api/clinics/{second['id']}",
+            headers={"X-Session-Token": token}
+        )
+        
+        response = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": token},
+            json={"name": "Klinik C"}
+        )
+        
+        assert second["id"] == "clinic-002"
+        assert response.json()["clinic"]["id"] == "clinic-003"
+    
+    def test_clinics_cursor_pagination(self, client):
+        
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        for name in ["Klinik A", "Klinik B", "Klinik C"]:
+            client.post(
+                "/api/clinics",
+                headers={"X-Session-Token": token},
+                json={"name": name}
+            )
+        
+        first_page = client.get("/api/clinics?limit=2&include_total=true").json()
+        assert [c["name"] for c in first_page["clinics"]] == ["Klinik A", "Klinik B"]
+        assert first_page["total"] == 3
+        assert first_page["next_cursor"]
+        
+        second_page = client.get(
+            f"/api/clinics?limit=2&after={first_page['next_cursor']}"
+        ).json()
+        assert [c["name"] for c in second_page["clinics"]] == ["Klinik C"]
+        assert second_page["next_cursor"] is None
+        assert "total" not in second_page
+    
+    def test_cursor_survives_deleted_row(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinics = [client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": token},
+            json={"name": name}
+        ).json()["clinic"] for name in ["Klinik A", "Klinik B", "Klinik C"]]
+        
+        first_page = client.get("/api/clinics?limit=2").json()
+        client.delete(f"/api/clinics/{clinics[1]['id']}", headers={"X-Session-Token": token})
+        
+        second_page = client.get(
+            f"/api/clinics?limit=2&after={first_page['next_cursor']}"
+        ).json()
+        assert [c["name"] for c in second_page["clinics"]] == ["Klinik C"]
+        
+        response = client.get("/api/clinics?after=bm90LWEtY3Vyc29y")
+        assert response.status_code == 400
+    
+    def test_clinic_board_snapshot_with_etag(self, client):
+        clinic = clinics.create_clinic("Klinik Test")
+        patient = users.create_user("Patient", "patient@test.com", "patient123", "08123456790")
+        first = queues.create_queue(patient.id, patient.name, clinic.id)
+        second = queues.create_queue(patient.id, patient.name, clinic.id)
+        queues.update_queue_status(first.id, QueueStatus.IN_SERVICE)
+        
+        response = client.get(f"/api/clinics/{clinic.id}/board")
+        assert response.status_code == 200
+        board = response.json()
+        assert [q["queue_number"] for q in board["now_serving"]] == [first.queue_number]
+        assert board["next"] == [second.queue_number]
+        etag = response.headers["etag"]
+        
+        cached = client.get(f"/api/clinics/{clinic.id}/board", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+        
+        queues.update_queue_status(second.id, QueueStatus.CANCELLED)
+        changed = client.get(f"/api/clinics/{clinic.id}/board", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["next"] == []
+        assert changed.headers["etag"] != etag
+        
+        assert client.get("/api/clinics/clinic-999/board").status_code == 404
+    
+    def test_catalog_conditional_get(self, client):
+        clinics.create_clinic("Klinik A")
+        
+        response = client.get("/api/clinics")
+        etag = response.headers["etag"]
+        assert response.json()["total"] == 1
+        assert "max-age" in response.headers["cache-control"]
+        
+        assert client.get("/api/clinics", headers={"If-None-Match": etag}).status_code == 304
+        assert client.get("/api/doctors", headers={"If-None-Match": etag}).status_code == 200
+        
+        clinics.create_clinic("Klinik B")
+        changed = client.get("/api/clinics", headers={"If-None-Match": etag})
+        assert changed.status_code == 200
+        assert changed.json()["total"] == 2
+        assert client.get("/api/clinics?is_active=true").json()["total"] == 2
 
 class TestDoctors:
     
@@ -255,6 +576,56 @@ class TestDoctors:
         
         assert response.status_code == 200
 
+    
+    def test_move_doctor_between_clinics(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        first, second = [client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": token},
+            json={"name": name}
+        ).json()["clinic"] for name in ["Klinik A", "Klinik B"]]
+        
+        doctor = client.post(
+            "/api/doctors",
+            headers={"X-Session-Token": token},
+            json={
+                "name": "Dr. Test",
+                "specialization": "Dokter Umum",
+                "clinic_id": first["id"],
+                "phone": "08123456789"
+            }
+        ).json()["doctor"]
+        
+        client.put(
+            f"/api/doctors/{doctor['id']}",
+            headers={"X-Session-Token": token},
+            json={"clinic_id": second["id"], "is_available": False}
+        )
+        
+        assert client.get(f"/api/doctors?clinic_id={first['id']}").json()["total"] == 0
+        assert client.get(f"/api/doctors?clinic_id={second['id']}").json()["total"] == 1
+        assert client.get(
+            f"/api/doctors?clinic_id={second['id']}&is_available=true"
+        ).json()["total"] == 0
+        
+        response = client.delete(
+            f"/api/clinics/{first['id']}",
+            headers={"X-Session-Token": token}
+        )
+        assert response.status_code == 200
+        
+        response = client.delete(
+            f"/api/clinics/{second['id']}",
+            headers={"X-Session-Token": token}
+        )
+        assert response.status_code == 400
 
 class TestQueueManagement:
     
@@ -292,6 +663,63 @@ class TestQueueManagement:
         assert data["queue"]["status"] == "menunggu"
         assert "queue_number" in data["queue"]
     
+    def test_live_updates_pushed_on_queue_change(self, client, monkeypatch):
+        monkeypatch.setattr(live.notifier, "tick", 0.01)
+        clinic = clinics.create_clinic("Klinik Test")
+        users.create_user("Patient", "patient@test.com", "patient123", "08123456790")
+        patient_token = client.post("/api/auth/login", json={
+            "email": "patient@test.com", "password": "patient123"
+        }).json()["session_token"]
+        
+        with client.websocket_connect(f"/api/queues/live/clinics/{clinic.id}") as board, \
+                client.websocket_connect(f"/api/queues/live/me?token={patient_token}") as me:
+            assert board.receive_json()["total_waiting"] == 0
+            assert me.receive_json()["position"] is None
+            
+            queue = client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": patient_token},
+                json={"clinic_id": clinic.id}
+            ).json()["queue"]
+            assert board.receive_json()["total_waiting"] == 1
+            assert me.receive_json()["position"] == 1
+            
+            queues.update_queue_status(queue["id"], QueueStatus.IN_SERVICE)
+            update = board.receive_json()
+            assert update["total_waiting"] == 0
+            assert update["now_serving"] == [queue["queue_number"]]
+            update = me.receive_json()
+            assert update["state"] == "called"
+            assert update["queue"]["id"] == queue["id"]
+            assert update["position"] is None
+            assert update["now_serving"] == [queue["queue_number"]]
+            
+            queues.update_queue_status(queue["id"], QueueStatus.COMPLETED)
+            assert board.receive_json()["now_serving"] == []
+            assert me.receive_json()["queue"] is None
+    
+    def test_queue_list_fragments_refreshed_on_update(self, client):
+        clinic = clinics.create_clinic("Klinik Test")
+        users.create_user("Admin", "admin@test.com", "admin123", "08123456789", role=UserRole.ADMIN)
+        patient = users.create_user("Patient", "patient@test.com", "patient123", "08123456790")
+        queue = queues.create_queue(patient.id, patient.name, clinic.id)
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        headers = {"X-Session-Token": admin_token}
+        
+        first = client.get("/api/queues", headers=headers).json()
+        second = client.get("/api/queues", headers=headers).json()
+        assert first == second
+        assert first["queues"][0]["status"] == "menunggu"
+        assert queue_routes.fragments.fragments.hits == 1
+        
+        queues.update_queue_status(queue.id, QueueStatus.CANCELLED)
+        updated = client.get("/api/queues?limit=1&include_total=true", headers=headers).json()
+        assert updated["queues"][0]["status"] == "dibatalkan"
+        assert updated["total"] == 1
+        assert updated["next_cursor"] is None
+    
     def test_complete_queue_flow(self, client):
         
         client.post("/api/auth/register", json={
@@ -347,6 +775,179 @@ class TestQueueManagement:
         assert complete_response.json()["queue"]["status"] == "selesai"
         assert "visit_history" in complete_response.json()
 
+    def test_queue_position_after_cancel(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": admin_token},
+            json={"name": "Klinik Test"}
+        ).json()["clinic"]
+        
+        tokens = []
+        queues = []
+        for i in range(3):
+            client.post("/api/auth/register", json={
+                "name": f"Patient {i}", "email": f"patient{i}@test.com",
+                "password": "patient123", "phone": "08123456790", "role": "patient"
+            })
+            token = client.post("/api/auth/login", json={
+                "email": f"patient{i}@test.com", "password": "patient123"
+            }).json()["session_token"]
+            response = client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": token},
+                json={"clinic_id": clinic["id"]}
+            )
+            assert response.json()["position"] == i + 1
+            tokens.append(token)
+            queues.append(response.json()["queue"])
+        
+        client.patch(
+            f"/api/queues/{queues[0]['id']}/cancel",
+            headers={"X-Session-Token": tokens[0]}
+        )
+        
+        response = client.get(
+            "/api/queues/my-position",
+            headers={"X-Session-Token": tokens[2]}
+        )
+        
+        assert response.status_code == 200
+        assert response.json()["position"] == 2
+        assert response.json()["total_waiting"] == 2
+    
+    def test_waiting_list_pages_past_called_patient(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": admin_token},
+            json={"name": "Klinik Test"}
+        ).json()["clinic"]
+        
+        queues = []
+        for i in range(3):
+            client.post("/api/auth/register", json={
+                "name": f"Patient {i}", "email": f"patient{i}@test.com",
+                "password": "patient123", "phone": "08123456790", "role": "patient"
+            })
+            token = client.post("/api/auth/login", json={
+                "email": f"patient{i}@test.com", "password": "patient123"
+            }).json()["session_token"]
+            queues.append(client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": token},
+                json={"clinic_id": clinic["id"]}
+            ).json()["queue"])
+        
+        url = f"/api/queues?clinic_id={clinic['id']}&status=menunggu&limit=1"
+        first_page = client.get(url, headers={"X-Session-Token": admin_token}).json()
+        assert [q["id"] for q in first_page["queues"]] == [queues[0]["id"]]
+        client.patch(f"/api/queues/{queues[0]['id']}/call", headers={"X-Session-Token": admin_token})
+        
+        second_page = client.get(
+            f"{url}&after={first_page['next_cursor']}",
+            headers={"X-Session-Token": admin_token}
+        ).json()
+        assert [q["id"] for q in second_page["queues"]] == [queues[1]["id"]]
+        assert second_page["next_cursor"]
+
+    def test_call_next_patient(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": admin_token},
+            json={"name": "Klinik Test"}
+        ).json()["clinic"]
+        
+        doctor = client.post(
+            "/api/doctors",
+            headers={"X-Session-Token": admin_token},
+            json={
+                "name": "Dr. Test",
+                "specialization": "Dokter Umum",
+                "clinic_id": clinic["id"],
+                "phone": "08123456789"
+            }
+        ).json()["doctor"]
+        
+        queues = []
+        for i in range(2):
+            client.post("/api/auth/register", json={
+                "name": f"Patient {i}", "email": f"patient{i}@test.com",
+                "password": "patient123", "phone": "08123456790", "role": "patient"
+            })
+            token = client.post("/api/auth/login", json={
+                "email": f"patient{i}@test.com", "password": "patient123"
+            }).json()["session_token"]
+            queues.append(client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": token},
+                json={"clinic_id": clinic["id"]}
+            ).json()["queue"])
+        
+        response = client.post(
+            f"/api/queues/clinics/{clinic['id']}/call-next",
+            headers={"X-Session-Token": admin_token}
+        )
+        assert response.status_code == 200
+        assert response.json()["queue"]["id"] == queues[0]["id"]
+        assert response.json()["queue"]["status"] == "sedang_dilayani"
+        
+        response = client.post(
+            f"/api/queues/clinics/{clinic['id']}/call-next?doctor_id={doctor['id']}",
+            headers={"X-Session-Token": admin_token}
+        )
+        assert response.status_code == 200
+        assert response.json()["queue"]["id"] == queues[1]["id"]
+        assert response.json()["queue"]["doctor_id"] == doctor["id"]
+        
+        response = client.post(
+            f"/api/queues/clinics/{clinic['id']}/call-next",
+            headers={"X-Session-Token": admin_token}
+        )
+        assert response.status_code == 404
+    
+    def test_unavailable_doctor_cannot_call_next(self, client):
+        users.create_user("Admin", "admin@test.com", "admin123", "08123456789", role=UserRole.ADMIN)
+        patient = users.create_user("Patient", "patient@test.com", "patient123", "08123456790")
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        clinic = clinics.create_clinic("Klinik Test")
+        doctor = doctors.create_doctor("Dr. Test", "Dokter Umum", clinic.id, "08123456789")
+        queue = queues.create_queue(patient.id, patient.name, clinic.id)
+        doctors.update_doctor(doctor.id, is_available=False)
+        
+        response = client.post(
+            f"/api/queues/clinics/{clinic.id}/call-next?doctor_id={doctor.id}",
+            headers={"X-Session-Token": admin_token}
+        )
+        
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Dokter tidak ditemukan atau tidak tersedia"
+        assert queues.read_queue(queue.id).status == QueueStatus.WAITING
+
 class TestVisitHistory:
     
     def test_visit_history_auto_created(self, client):
@@ -406,6 +1007,87 @@ class TestVisitHistory:
         assert data["total"] == 1
         assert data["visit_history"][0]["diagnosis"] == "Flu"
 
+    
+    def test_visit_history_scoped_to_patient(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Patient", "email": "patient@test.com",
+            "password": "patient123", "phone": "08123456790", "role": "patient"
+        })
+        login = client.post("/api/auth/login", json={
+            "email": "patient@test.com", "password": "patient123"
+        }).json()
+        
+        for patient_id, queue_id in [(login["user"]["id"], "queue-1"), ("someone-else", "queue-2")]:
+            visits.create_visit(
+                queue_id=queue_id, patient_id=patient_id, patient_name="Patient",
+                clinic_id="clinic-001", clinic_name="Klinik Test",
+                doctor_id="doctor-001", doctor_name="Dr. Test"
+            )
+        
+        response = client.get(
+            "/api/visit-history",
+            headers={"X-Session-Token": login["session_token"]}
+        )
+        
+        assert response.json()["total"] == 1
+        assert response.json()["visit_history"][0]["queue_id"] == "queue-1"
+        assert visits.get_visits_by_queue("queue-2").patient_id == "someone-else"
+        
+        visits.delete_visit(visits.get_visits_by_queue("queue-2").id)
+        assert visits.get_visits_by_queue("queue-2") is None
+    
+    def test_visit_pages_follow_cursor_order_after_update(self, client):
+        users.create_user("Admin", "admin@test.com", "admin123", "08123456789", role=UserRole.ADMIN)
+        patient = users.create_user("Patient", "patient@test.com", "patient123", "08123456790")
+        tokens = {
+            email: client.post("/api/auth/login", json={"email": email, "password": password}).json()["session_token"]
+            for email, password in [("admin@test.com", "admin123"), ("patient@test.com", "patient123")]
+        }
+        created = [visits.create_visit(
+            queue_id=f"queue-{i}", patient_id=patient.id, patient_name="Patient",
+            clinic_id="clinic-001", clinic_name="Klinik Test",
+            doctor_id="doctor-001", doctor_name="Dr. Test"
+        ) for i in range(2)]
+        today = created[0].visit_date
+        visits.update_visit(created[0].id, visit_date="2000-01-01")
+        visits.update_visit(created[0].id, visit_date=today)
+        
+        for token in tokens.values():
+            headers = {"X-Session-Token": token}
+            first = client.get("/api/visit-history?limit=1", headers=headers).json()
+            visits.update_visit(created[1].id, diagnosis="Flu")
+            second = client.get(
+                f"/api/visit-history?limit=1&after={first['next_cursor']}", headers=headers
+            ).json()
+            
+            seen = [v["queue_id"] for v in first["visit_history"] + second["visit_history"]]
+            assert seen == ["queue-0", "queue-1"]
+    
+    def test_visits_filtered_by_clinic(self, client):
+        users.create_user("Admin", "admin@test.com", "admin123", "08123456789", role=UserRole.ADMIN)
+        headers = {"X-Session-Token": client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]}
+        for i in range(6):
+            visit = visits.create_visit(
+                queue_id=f"queue-{i}", patient_id=f"patient-{i % 2}", patient_name="Patient",
+                clinic_id=f"clinic-{i % 3}", clinic_name="Klinik Test",
+                doctor_id="doctor-001", doctor_name="Dr. Test"
+            )
+            visits.update_visit(visit.id, visit_date=f"2024-01-0{i + 1}")
+        
+        first = client.get("/api/visit-history?clinic_id=clinic-0&limit=1&include_total=true", headers=headers).json()
+        second = client.get(
+            f"/api/visit-history?clinic_id=clinic-0&limit=1&after={first['next_cursor']}", headers=headers
+        ).json()
+        
+        assert first["total"] == 2
+        assert [v["queue_id"] for v in first["visit_history"] + second["visit_history"]] == ["queue-3", "queue-0"]
+        assert second["next_cursor"] is None
+        
+        response = client.get("/api/visit-history?clinic_id=clinic-1&patient_id=patient-0", headers=headers).json()
+        assert [v["queue_id"] for v in response["visit_history"]] == ["queue-4"]
+        assert visits.count_visits(clinic_id="clinic-2", start_date=date(2024, 1, 4)) == 1
 
 class TestStatistics:
     
@@ -428,4 +1110,247 @@ class TestStatistics:
         assert "total_queues" in data
         assert "waiting" in data
         assert "completed" in data
-        assert "average_service_time_minutes" in data
\ No newline at end of file
+        assert "average_service_time_minutes" in data
+    
+    def test_queue_summary_counts_transitions(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": admin_token},
+            json={"name": "Klinik Test"}
+        ).json()["clinic"]
+        
+        queues = []
+        for i in range(3):
+            client.post("/api/auth/register", json={
+                "name": f"Patient {i}", "email": f"patient{i}@test.com",
+                "password": "patient123", "phone": "08123456790", "role": "patient"
+            })
+            token = client.post("/api/auth/login", json={
+                "email": f"patient{i}@test.com", "password": "patient123"
+            }).json()["session_token"]
+            queues.append(client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": token},
+                json={"clinic_id": clinic["id"]}
+            ).json()["queue"])
+        
+        client.patch(f"/api/queues/{queues[0]['id']}/call",
+                     headers={"X-Session-Token": admin_token})
+        client.patch(f"/api/queues/{queues[0]['id']}/complete",
+                     headers={"X-Session-Token": admin_token})
+        client.patch(f"/api/queues/{queues[1]['id']}/cancel",
+                     headers={"X-Session-Token": admin_token})
+        
+        response = client.get(
+            f"/api/statistics/queue-summary?clinic_id={clinic['id']}",
+            headers={"X-Session-Token": admin_token}
+        )
+        
+        data = response.json()
+        assert data["total_queues"] == 3
+        assert data["waiting"] == 1
+        assert data["in_service"] == 0
+        assert data["completed"] == 1
+        assert data["cancelled"] == 1
+    
+    def test_clinic_density_top_n(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic_ids = []
+        for name in ["Klinik A", "Klinik B", "Klinik C"]:
+            clinic_ids.append(client.post(
+                "/api/clinics",
+                headers={"X-Session-Token": admin_token},
+                json={"name": name}
+            ).json()["clinic"]["id"])
+        
+        client.post("/api/auth/register", json={
+            "name": "Patient", "email": "patient@test.com",
+            "password": "patient123", "phone": "08123456790", "role": "patient"
+        })
+        patient_token = client.post("/api/auth/login", json={
+            "email": "patient@test.com", "password": "patient123"
+        }).json()["session_token"]
+        
+        for clinic_id in [clinic_ids[1], clinic_ids[1], clinic_ids[2]]:
+            client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": patient_token},
+                json={"clinic_id": clinic_id}
+            )
+        
+        response = client.get(
+            "/api/statistics/clinic-density?top_n=2",
+            headers={"X-Session-Token": admin_token}
+        )
+        
+        density = response.json()["clinic_density"]
+        assert [c["clinic_id"] for c in density] == [clinic_ids[1], clinic_ids[2]]
+        assert density[0]["waiting"] == 2
+        assert density[0]["active_patients"] == 2
+    
+    def test_daily_visits_date_range(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        for visit_date in ["2024-01-01", "2024-01-02", "2024-01-02", "2024-01-05"]:
+            visit = visits.create_visit(
+                queue_id="queue", patient_id="patient", patient_name="Patient",
+                clinic_id="clinic-001", clinic_name="Klinik Test",
+                doctor_id="doctor-001", doctor_name="Dr. Test"
+            )
+            visits.update_visit(visit.id, visit_date=visit_date)
+        
+        response = client.get(
+            "/api/statistics/daily-visits?start_date=2024-01-02&end_date=2024-01-05",
+            headers={"X-Session-Token": admin_token}
+        )
+        
+        data = response.json()
+        assert data["total_visits"] == 3
+        assert data["clinic_breakdown"][0]["total_visits"] == 3
+        assert data["daily_breakdown"] == [
+            {"date": "2024-01-02", "total_visits": 2},
+            {"date": "2024-01-05", "total_visits": 1}
+        ]
+        
+        response = client.get(
+            "/api/statistics/daily-visits?visit_date=2024-01-01",
+            headers={"X-Session-Token": admin_token}
+        )
+        assert response.json()["total_visits"] == 1
+    
+    def test_duration_percentiles_and_histogram(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": admin_token},
+            json={"name": "Klinik Test"}
+        ).json()["clinic"]
+        
+        queues = []
+        for i in range(3):
+            client.post("/api/auth/register", json={
+                "name": f"Patient {i}", "email": f"patient{i}@test.com",
+                "password": "patient123", "phone": "08123456790", "role": "patient"
+            })
+            token = client.post("/api/auth/login", json={
+                "email": f"patient{i}@test.com", "password": "patient123"
+            }).json()["session_token"]
+            queues.append(client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": token},
+                json={"clinic_id": clinic["id"]}
+            ).json()["queue"])
+        
+        for queue in queues[:2]:
+            client.patch(f"/api/queues/{queue['id']}/call",
+                         headers={"X-Session-Token": admin_token})
+            client.patch(f"/api/queues/{queue['id']}/complete",
+                         headers={"X-Session-Token": admin_token})
+        
+        data = client.get(
+            "/api/statistics/durations?metric=wait&group_by=clinic",
+            headers={"X-Session-Token": admin_token}
+        ).json()
+        assert len(data["groups"]) == 1
+        assert data["groups"][0]["clinic_id"] == clinic["id"]
+        assert data["groups"][0]["clinic_name"] == "Klinik Test"
+        assert data["groups"][0]["count"] == 2
+        assert {"mean_minutes", "p50_minutes", "p90_minutes", "p99_minutes"} <= set(data["groups"][0])
+        
+        histogram = client.get(
+            "/api/statistics/durations/histogram?metric=service&bin_minutes=1&max_minutes=10",
+            headers={"X-Session-Token": admin_token}
+        ).json()
+        assert len(histogram["bins"]) == 10
+        assert histogram["bins"][0]["count"] == 2
+        assert histogram["total"] == 2
+        
+        response = client.get(
+            "/api/statistics/durations/histogram?bin_minutes=0.01&max_minutes=1000",
+            headers={"X-Session-Token": admin_token}
+        )
+        assert response.status_code == 400
+    
+    def test_wait_time_quantiles(self, client):
+        client.post("/api/auth/register", json={
+            "name": "Admin", "email": "admin@test.com",
+            "password": "admin123", "phone": "08123456789", "role": "admin"
+        })
+        admin_token = client.post("/api/auth/login", json={
+            "email": "admin@test.com", "password": "admin123"
+        }).json()["session_token"]
+        
+        clinic = client.post(
+            "/api/clinics",
+            headers={"X-Session-Token": admin_token},
+            json={"name": "Klinik Test"}
+        ).json()["clinic"]
+        
+        queues = []
+        for i in range(2):
+            client.post("/api/auth/register", json={
+                "name": f"Patient {i}", "email": f"patient{i}@test.com",
+                "password": "patient123", "phone": "08123456790", "role": "patient"
+            })
+            token = client.post("/api/auth/login", json={
+                "email": f"patient{i}@test.com", "password": "patient123"
+            }).json()["session_token"]
+            queues.append(client.post(
+                "/api/queues/register",
+                headers={"X-Session-Token": token},
+                json={"clinic_id": clinic["id"]}
+            ).json()["queue"])
+        
+        for queue in queues:
+            client.patch(f"/api/queues/{queue['id']}/call",
+                         headers={"X-Session-Token": admin_token})
+        client.patch(f"/api/queues/{queues[0]['id']}/complete",
+                     headers={"X-Session-Token": admin_token})
+        
+        data = client.get(
+            f"/api/statistics/wait-times?clinic_id={clinic['id']}&hours=1",
+            headers={"X-Session-Token": admin_token}
+        ).json()
+        assert data["wait"]["count"] == 2
+        assert data["service"]["count"] == 1
+        assert {"p50_minutes", "p90_minutes", "p99_minutes"} <= set(data["wait"])
+        
+        grouped = client.get(
+            "/api/statistics/wait-times?group_by=clinic",
+            headers={"X-Session-Token": admin_token}
+        ).json()
+        assert [g["clinic_name"] for g in grouped["groups"]] == ["Klinik Test"]
+        
+        hourly = client.get(
+            "/api/statistics/wait-times?group_by=hour",
+            headers={"X-Session-Token": admin_token}
+        ).json()
+        assert sum(g["wait"]["count"] for g in hourly["groups"]) == 2
@@ -0,0 +1,73 @@
+import pytest
+from modules.items import persistence, repository, users, clinics, doctors, queues, visits
+from modules.schema.schemas import QueueStatus
+
+pytestmark = pytest.mark.skipif(repository.using_sql(), reason="journal only backs in-memory storage")
+
+
+def clear_stores():
+    for table in [users.users_db, clinics.clinics_db, doctors.doctors_db, queues.queues_db, visits.visits_db]:
+        table.clear()
+    users.passwords_db.clear()
+    users.sessions_db.clear()
+    users.session_expiry.clear()
+    users.user_sessions.clear()
+    users.principal_cache.clear()
+    users.revoked_tokens.clear()
+    queues.queue_counters.clear()
+    queues.waiting_lines.clear()
+    queues.doctor_lines.clear()
+    queues.rebuild_queue_stats()
+    clinics.clinic_ids.reset()
+
+
+def populate():
+    patient = users.create_user("Patient", "patient@test.com", "patient123", "08123456790")
+    clinic = clinics.create_clinic("Klinik Test")
+    first = queues.create_queue(patient.id, patient.name, clinic.id)
+    second = queues.create_queue(patient.id, patient.name, clinic.id)
+    queues.update_queue_status(first.id, QueueStatus.IN_SERVICE)
+    clinics.create_clinic("Klinik Hapus")
+    clinics.delete_clinic("clinic-002")
+    return patient, clinic, second
+
+
+class TestPersistence:
+    
+    def test_replay_journal_after_restart(self, tmp_path):
+        persistence.open_journal(str(tmp_path))
+        try:
+            patient, clinic, second = populate()
+        finally:
+            persistence.close_journal()
+        clear_stores()
+        
+        persistence.open_journal(str(tmp_path))
+        try:
+            assert users.read_user_by_email("patient@test.com").id == patient.id
+            assert users.verify_password(patient.id, "patient123")
+            assert list(clinics.clinics_db) == [clinic.id]
+            assert queues.get_queue_position(second.id) == 1
+            assert queues.read_queue_stats(clinic.id)["in_service"] == 1
+            assert clinics.create_clinic("Klinik Baru").id == "clinic-003"
+        finally:
+            persistence.close_journal()
+    
+    def test_snapshot_compacts_journal(self, tmp_path):
+        persistence.open_journal(str(tmp_path), snapshot_every=5)
+        try:
+            patient, clinic, second = populate()
+        finally:
+            persistence.close_journal()
+        clear_stores()
+        
+        assert (tmp_path / persistence.SNAPSHOT_FILE).exists()
+        assert len(persistence._segments(str(tmp_path))) <= 2
+        
+        persistence.open_journal(str(tmp_path))
+        try:
+            assert queues.read_queue(second.id).status == QueueStatus.WAITING
+            assert len(queues.queues_db) == 2
+            assert list(clinics.clinics_db) == [clinic.id]
+        finally:
+            persistence.close_journal()
@@ -0,0 +1,34 @@
+from modules.items.queues import WaitingLine
+
+
+class TestWaitingLine:
+    def test_positions_follow_arrival_order(self):
+        line = WaitingLine()
+        for queue_id in "abcde":
+            line.push(queue_id)
+        line.remove("b")
+        assert list(line) == ["a", "c", "d", "e"]
+        assert [line.position(q) for q in "acde"] == [1, 2, 3, 4]
+        assert line.position("b") == 0
+        assert line.peek() == "a"
+
+    def test_removed_slots_are_reclaimed(self):
+        line = WaitingLine()
+        for i in range(1000):
+            line.push(str(i))
+            if i >= 3:
+                line.remove(str(i - 3))
+        assert list(line) == ["997", "998", "999"]
+        assert [line.position(q) for q in ["997", "998", "999"]] == [1, 2, 3]
+        assert len(line._slots) <= 2 * len(line) + 1
+
+    def test_head_skips_removed_front(self):
+        line = WaitingLine()
+        for queue_id in "abcdef":
+            line.push(queue_id)
+        line.remove("a")
+        line.remove("b")
+        assert line._head == 2
+        line.push("b")
+        assert list(line) == ["c", "d", "e", "f", "b"]
+        assert line.position("b") == 5
@@ -0,0 +1,62 @@
+import json
+from modules.items.records import trusted, row_codec
+from modules.schema.schemas import Queue, QueueStatus
+from modules.items.queues import QueueRecord
+
+
+class TestTrustedRecords:
+    
+    def test_trusted_matches_validated_model(self):
+        values = {
+            "id": "q1", "queue_number": "KLI001", "patient_id": "p1", "patient_name": "Patient",
+            "clinic_id": "c1", "clinic_name": "Klinik", "status": QueueStatus.WAITING,
+            "registration_time": "2024-01-01T08:00:00"
+        }
+        
+        row = trusted(Queue)(**values)
+        
+        assert row == Queue(**values)
+        assert row.model_dump_json() == Queue(**values).model_dump_json()
+        assert row.doctor_id is None
+
+
+class TestCompactRecords:
+    
+    def test_round_trip_through_public_schema(self):
+        queue = Queue(
+            id="q1", queue_number="KLI001", patient_id="p1", patient_name="Patient",
+            clinic_id="c1", clinic_name="Klinik", status=QueueStatus.COMPLETED,
+            registration_time="2024-01-01T08:00:00", called_time="2024-01-01T08:10:00.250000",
+            service_start_time="2024-01-01T08:10:00.250000", service_end_time="2024-01-01T08:25:00"
+        )
+        
+        record = QueueRecord.from_schema(queue)
+        
+        assert record.service_end_at - record.service_start_at == 899_750_000
+        assert record.to_schema() == queue
+        assert record.to_dict() == queue.model_dump(mode="json")
+        assert QueueRecord.from_dict(record.to_dict()) == record
+    
+    def test_clinic_strings_are_shared(self):
+        first = QueueRecord(id="q1", clinic_name="".join(["Klinik ", "Umum"]))
+        second = QueueRecord(id="q2", clinic_name="".join(["Klinik ", "Umum"]))
+        
+        assert first.clinic_name is second.clinic_name
+        assert not hasattr(first, "__dict__")
+    
+    def test_storage_codec_keeps_slot_values(self):
+        record = QueueRecord(
+            id="q1", queue_number="KLI001", patient_id="p1", patient_name="Patient",
+            clinic_id="c1", clinic_name="Klinik", status=QueueStatus.COMPLETED,
+            registration_at=1_704_096_000_000_000, service_end_at=1_704_096_900_000_000
+        )
+        codec = row_codec(QueueRecord)
+        
+        stored = json.loads(json.dumps(codec.encode(record)))
+        restored = codec.decode(stored)
+        
+        assert stored["registration_at"] == 1_704_096_000_000_000
+        assert restored == record
+        assert restored.status is QueueStatus.COMPLETED
+        assert restored.clinic_name is record.clinic_name
+        assert codec.decode(record.to_dict()) == record
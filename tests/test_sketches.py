@@ -0,0 +1,33 @@
+from modules.items.sketches import DDSketch, WaitTimeSketches, HOUR
+
+
+class TestSketches:
+    
+    def test_quantiles_within_relative_accuracy_and_mergeable(self):
+        values = [float(v) for v in range(1, 10_001)]
+        whole, low, high = DDSketch(alpha=0.01), DDSketch(alpha=0.01), DDSketch(alpha=0.01)
+        for v in values:
+            whole.add(v)
+            (low if v <= 5000 else high).add(v)
+        low.merge(high)
+        
+        for q in (0.5, 0.9, 0.99):
+            exact = values[int(q * (len(values) - 1))]
+            assert abs(whole.quantile(q) - exact) <= 0.01 * exact
+        assert low.buckets == whole.buckets and low.count == whole.count
+    
+    def test_memory_stays_bounded(self):
+        sketch = DDSketch(alpha=0.01, max_buckets=64)
+        for i in range(1, 100_000):
+            sketch.add(i * 0.37)
+        
+        assert len(sketch.buckets) <= 64
+        assert abs(sketch.quantile(0.99) - 0.99 * 37_000) <= 0.01 * 37_000
+    
+    def test_hourly_windows_expire(self):
+        sketches = WaitTimeSketches(window_hours=2)
+        for hour in range(5):
+            sketches.observe("wait", 60.0, hour * HOUR, "c1", "d1")
+        
+        assert sorted(sketches.windows("wait", ("clinic", "c1"))) == [3, 4]
+        assert sketches.sketch("wait", ("doctor", "d1")).count == 5
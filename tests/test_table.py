@@ -0,0 +1,126 @@
+import pytest
+from pydantic import BaseModel
+from sqlalchemy import Column, Integer, MetaData, String, Table as SqlSchema, create_engine
+from sqlalchemy.pool import StaticPool
+from modules.items.table import Table, Index
+from modules.items.sql_table import SqlTable, SqlMapping
+from models import KeyValueRow
+
+
+class Row(BaseModel):
+    id: str
+    group: str
+    status: str
+    email: str = ""
+
+
+def default_indexes():
+    return [
+        Index("group"),
+        Index("status"),
+        Index("group_status", ("group", "status")),
+        Index("email", key=lambda r: r.email.lower(), unique=True),
+    ]
+
+
+def memory_table(indexes):
+    return Table("rows", indexes)
+
+
+def sql_table(indexes):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    metadata = MetaData()
+    schema = SqlSchema(
+        "rows", metadata,
+        Column("seq", Integer, primary_key=True, autoincrement=True),
+        Column("id", String(36), unique=True, nullable=False),
+        Column("group", String(20), index=True),
+        Column("status", String(20), index=True),
+        Column("email", String(255)),
+        Column("email_key", String(255), unique=True),
+    )
+    metadata.create_all(engine)
+    return SqlTable("rows", Row, indexes, table=schema, engine=engine, batch_size=2)
+
+
+@pytest.fixture(params=[memory_table, sql_table], ids=["memory", "sql"])
+def new_table(request):
+    return lambda indexes=None: request.param(indexes or default_indexes())
+
+
+class TestTable:
+    
+    def test_filter_uses_indexes_and_keeps_insertion_order(self, new_table):
+        table = new_table()
+        for i in range(6):
+            table.insert(Row(id=str(i), group="a" if i % 2 else "b", status="new", email=f"{i}@x"))
+        table.update("1", status="done")
+        table.update("3", status="done")
+        
+        assert [r.id for r in table.filter(ordered=True, status="done")] == ["1", "3"]
+        assert [r.id for r in table.filter(ordered=True, group="a", status="new")] == ["5"]
+        assert table.count(group="b") == 3
+        assert table.count(group="a", status="done") == 2
+        assert list(table.filter(group="c")) == []
+    
+    def test_ordered_filter_follows_insertion_not_update_order(self, new_table):
+        table = new_table()
+        for i in range(5):
+            table.insert(Row(id=str(i), group="a", status="new", email=f"{i}@x"))
+        for row_id in ["4", "2", "0"]:
+            table.update(row_id, status="done")
+        table.delete("2")
+        table.update("1", status="done")
+        
+        assert [r.id for r in table.filter(ordered=True, status="done")] == ["0", "1", "4"]
+    
+    def test_update_moves_row_between_buckets(self, new_table):
+        table = new_table()
+        table.insert(Row(id="1", group="a", status="new"))
+        table.update("1", group="b")
+        
+        assert table.count(group="a") == 0
+        assert [r.id for r in table.lookup("group", "b")] == ["1"]
+    
+    def test_unique_index_rejects_duplicates(self, new_table):
+        table = new_table()
+        table.insert(Row(id="1", group="a", status="new", email="A@x"))
+        table.insert(Row(id="2", group="a", status="new", email="b@x"))
+        
+        with pytest.raises(ValueError):
+            table.insert(Row(id="3", group="a", status="new", email="a@X"))
+        with pytest.raises(ValueError):
+            table.update("2", email="a@x")
+        
+        assert table["2"].email == "b@x"
+        assert table.first("email", "b@x").id == "2"
+        assert len(table) == 2
+    
+    def test_delete_and_ordered_range(self, new_table):
+        table = new_table([Index("status", ordered=True)])
+        for i, status in enumerate(["c", "a", "b", "a"]):
+            table.insert(Row(id=str(i), group="g", status=status))
+        table.delete("2")
+        
+        assert table.index("status").keys_between("a", "b") == ["a"]
+        assert table.index("status").keys_between() == ["a", "c"]
+        assert "2" not in table
+
+
+class TestSqlMapping:
+    
+    def test_round_trip_per_store(self):
+        engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+        KeyValueRow.__table__.create(engine)
+        counters = SqlMapping("counters", engine=engine)
+        other = SqlMapping("other", engine=engine)
+    
+        counters["a"] = 1
+        counters["a"] += 1
+        other["a"] = "x"
+    
+        assert counters["a"] == 2
+        assert dict(counters) == {"a": 2}
+        del counters["a"]
+        assert "a" not in counters
+        assert other.get("a") == "x"